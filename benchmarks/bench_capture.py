@@ -0,0 +1,52 @@
+"""CPU cost of the native-rate capture front-end (downmix + resampling to 16 kHz).
+
+Feeds synthetic int16 blocks of the configured length through
+CaptureFrontEnd.process for common device formats and reports CPU seconds
+per second of audio.
+
+Run from the repository root:
+    python -m benchmarks.bench_capture --seconds 60
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from voice_assistant.asr.capture import CaptureFrontEnd
+from voice_assistant.config import BLOCKSIZE, SAMPLE_RATE
+
+FORMATS = ((48000, 1), (48000, 2), (44100, 2), (48000, 4), (22050, 1))
+
+
+def make_blocks(rate: int, channels: int, blocksize: int, seconds: float) -> list:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(rate * seconds)) / rate
+    tone = 8000 * np.sin(2 * np.pi * 440 * t)
+    audio = tone[:, None] + rng.normal(0, 500, (len(t), channels))
+    audio = np.clip(audio, -32768, 32767).astype(np.int16)
+    return [audio[i:i + blocksize] for i in range(0, len(audio), blocksize)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--blocksize", type=int, default=BLOCKSIZE, help="block size at the model rate")
+    args = parser.parse_args()
+
+    print(f"{'format':>16}  {'CPU s':>7}  {'CPU s / audio s':>15}")
+    for rate, channels in FORMATS:
+        frontend = CaptureFrontEnd(SAMPLE_RATE, samplerate=rate, channels=channels).configure()
+        blocks = make_blocks(rate, channels, frontend.device_blocksize(args.blocksize), args.seconds)
+        start = time.process_time()
+        out = 0
+        for block in blocks:
+            out += len(frontend.process(block))
+        cpu = time.process_time() - start
+        print(f"{rate:>8} Hz {channels} ch  {cpu:7.3f}  {cpu / args.seconds:15.5f}")
+        assert abs(out / 2 - args.seconds * SAMPLE_RATE) <= SAMPLE_RATE * 0.01
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Memory per session and lookup cost of the conversation context store.
+
+Run from the repository root:
+    python -m benchmarks.bench_sessions --sessions 100000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from voice_assistant.dialogue.context import SessionStore
+from voice_assistant.interfaces import Intent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=1000000)
+    args = parser.parse_args()
+
+    intent = Intent(name="weather_query", slots={"location": "Marburg", "day": 1})
+
+    # the id strings are created inside the traced region, the store keeps them as keys
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = SessionStore(max_sessions=args.sessions, idle_timeout=3600.0)
+    for i in range(args.sessions):
+        store.get(f"session-{i}").remember(intent)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    per_session = (after - before) / args.sessions
+    print(f"sessions:            {len(store)}")
+    print(f"memory total:        {(after - before) / 1e6:.1f} MB")
+    print(f"memory per session:  {per_session:.0f} B (incl. id string and LRU entry)")
+
+    rng = random.Random(0)
+    keys = [f"session-{rng.randrange(args.sessions)}" for _ in range(args.lookups)]
+    start = time.perf_counter()
+    for sid in keys:
+        store.get(sid)
+    elapsed = time.perf_counter() - start
+    print(f"lookup (hit):        {elapsed / args.lookups * 1e9:.0f} ns")
+
+    misses = [f"new-{i}" for i in range(args.lookups // 10)]
+    start = time.perf_counter()
+    for sid in misses:
+        store.get(sid)
+    elapsed = time.perf_counter() - start
+    print(f"lookup (miss+evict): {elapsed / len(misses) * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""CPU cost of continuous decoding versus wake-word gated decoding.
+
+Feeds a recorded fixture (16 kHz, mono, 16-bit WAV) through ASR.process
+block by block, once without and once with the wake-word stage. The wake
+window is timed in audio seconds, since the fixture is decoded much faster
+than real time.
+
+Run from the repository root:
+    python -m benchmarks.bench_wakeword --audio fixtures/kitchen.wav
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import wave
+
+from voice_assistant.asr import ASR
+from voice_assistant.config import BLOCKSIZE, MODEL_PATH, SAMPLE_RATE, WAKE_PHRASES
+
+
+def read_blocks(path: str, blocksize: int) -> list:
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise SystemExit(f"{path}: expected {SAMPLE_RATE} Hz mono 16-bit audio")
+        frames = wav.readframes(wav.getnframes())
+    step = blocksize * 2
+    return [frames[i:i + step] for i in range(0, len(frames), step)]
+
+
+# position in the fixture, in seconds of audio fed so far
+class AudioClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run(asr: ASR, blocks: list, clock: AudioClock) -> tuple:
+    utterances = []
+    asr.set_callback(utterances.append)
+    start = time.process_time()
+    for index, block in enumerate(blocks):
+        clock.now = index * asr.blocksize / asr.sample_rate
+        asr.process(block)
+    return time.process_time() - start, utterances
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--audio", required=True, help="16 kHz mono 16-bit WAV fixture")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--blocksize", type=int, default=BLOCKSIZE)
+    args = parser.parse_args()
+
+    blocks = read_blocks(args.audio, args.blocksize)
+    audio_seconds = len(blocks) * args.blocksize / SAMPLE_RATE
+
+    continuous = ASR(args.model, SAMPLE_RATE, args.blocksize)
+    continuous.prepare()
+    clock = AudioClock()
+    gated = ASR(args.model, SAMPLE_RATE, args.blocksize, wake_phrases=WAKE_PHRASES, wake_clock=clock)
+    gated.model = continuous.model
+    gated.prepare()
+
+    cpu_full, texts_full = run(continuous, blocks, AudioClock())
+    cpu_gated, texts_gated = run(gated, blocks, clock)
+
+    print(f"audio:       {audio_seconds:.1f} s in {len(blocks)} blocks")
+    print(f"continuous:  {cpu_full:.2f} CPU s ({cpu_full / audio_seconds:.3f} CPU s per audio s), "
+          f"{len(texts_full)} utterances")
+    print(f"wake-gated:  {cpu_gated:.2f} CPU s ({cpu_gated / audio_seconds:.3f} CPU s per audio s), "
+          f"{len(texts_gated)} utterances")
+    if cpu_full > 0:
+        print(f"CPU saved:   {100 * (1 - cpu_gated / cpu_full):.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""Load generator: many concurrent voice sessions against local stub services.
+
+Every session replays recorded fixtures (16 kHz, mono, 16-bit WAV) in real
+time through its own recognizer (the Vosk model is shared), SimpleRuleNLU,
+SimpleDialogueManager and TTS rendering into a null audio sink. Weather and
+calendar requests go to stub HTTP servers on localhost, calendar writes
+through the same local journal the assistant uses. The number of sessions is
+stepped up until the latency objective is missed, too many turns fail, or
+sessions fall behind real time.
+
+Turn latency is measured from the moment the block that ended an utterance
+would have arrived from the microphone until its response has been rendered.
+Failed turns count towards the error rate only, not the latency percentiles.
+
+Run from the repository root:
+    python -m benchmarks.loadgen --audio fixtures/weather.wav fixtures/calendar.wav --max-sessions 64
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from voice_assistant.apis.calendar import RestCalendarClient
+from voice_assistant.apis.journal import CalendarJournal, JournaledCalendarClient
+from voice_assistant.apis.weather import RestWeatherClient
+from voice_assistant.app import speak_utterance
+from voice_assistant.asr import ASR
+from voice_assistant.config import ASR_MAX_ALTERNATIVES, BLOCKSIZE, MODEL_PATH, SAMPLE_RATE
+from voice_assistant.dialogue.context import SessionStore
+from voice_assistant.dialogue.manager import SimpleDialogueManager
+from voice_assistant.interfaces import SpeechSynthesizer
+from voice_assistant.nlu.rule_based import SimpleRuleNLU
+
+FORECAST = [
+    {"day": day, "weather": weather, "temperature": {"min": low, "max": high}}
+    for day, weather, low, high in (
+        ("Monday", "sunny", 9, 21),
+        ("Tuesday", "cloudy", 8, 17),
+        ("Wednesday", "rainy", 7, 14),
+        ("Thursday", "sunny", 10, 22),
+        ("Friday", "windy", 6, 15),
+    )
+]
+
+
+# ---- Stub services ----
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers like the weather and calendar APIs, after `server.latency` seconds."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def reply(self, body: Any, status: int = 200) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def route(self, method: str) -> None:
+        time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        body = self.read_body()
+        if url.path == "/weather.php" and method == "POST":
+            self.reply({"place": parse_qs(body.decode()).get("place", [""])[0], "forecast": FORECAST})
+        elif url.path == "/calendar.php":
+            event_id = parse_qs(url.query).get("id", [None])[0]
+            self.calendar(method, int(event_id) if event_id else None, json.loads(body) if body else {})
+        else:
+            self.reply({"message": "not found"}, 404)
+
+    def calendar(self, method: str, event_id: Optional[int], payload: Dict[str, Any]) -> None:
+        server = self.server
+        with server.lock:
+            if method == "GET" and event_id is None:
+                return self.reply({"entries": list(server.events.values())})
+            if method == "POST":
+                server.next_id += 1
+                entry = server.events[server.next_id] = {"id": server.next_id, **payload}
+                return self.reply({"entry": entry})
+            if event_id not in server.events:
+                return self.reply({"message": "not found"}, 404)
+            if method == "GET":
+                return self.reply({"entry": server.events[event_id]})
+            if method == "PUT":
+                server.events[event_id].update(payload)
+                return self.reply({"entry": server.events[event_id]})
+            return self.reply({"message": "deleted", "entry": server.events.pop(event_id)})
+
+    def do_GET(self) -> None:
+        self.route("GET")
+
+    def do_POST(self) -> None:
+        self.route("POST")
+
+    def do_PUT(self) -> None:
+        self.route("PUT")
+
+    def do_DELETE(self) -> None:
+        self.route("DELETE")
+
+
+def start_stub_server(latency: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.events = {}
+    server.next_id = 0
+    threading.Thread(target=server.serve_forever, name="stub-api", daemon=True).start()
+    return server
+
+
+# ---- Sessions ----
+
+class NullSink(SpeechSynthesizer):
+    """Renders responses like the real backend (when given one) and discards the audio."""
+
+    def __init__(self, renderer: Any = None) -> None:
+        self.renderer = renderer
+
+    def speak(self, text: str) -> None:
+        self.speak_parts("", text)
+
+    def speak_parts(self, prefix: str, tail: str) -> None:
+        if self.renderer is None:
+            return
+        if prefix:
+            # served from the prefix cache after the first turn, as in the assistant
+            self.renderer.warm([prefix])
+        if tail:
+            self.renderer.synthesize(tail)
+
+
+class LevelStats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.max_lag = 0.0
+        self.errors = 0
+        self.recording = False
+
+    def turn(self, latency: float) -> None:
+        if self.recording:
+            with self.lock:
+                self.latencies.append(latency)
+
+    def lag(self, lag: float) -> None:
+        if self.recording and lag > self.max_lag:
+            with self.lock:
+                self.max_lag = max(self.max_lag, lag)
+
+    def error(self) -> None:
+        if self.recording:
+            with self.lock:
+                self.errors += 1
+
+
+class Session:
+    def __init__(
+        self,
+        session_id: str,
+        model: Any,
+        fixtures: List[List[bytes]],
+        blocksize: int,
+        dm: SimpleDialogueManager,
+        sessions: SessionStore,
+        sink: SpeechSynthesizer,
+        stats: LevelStats,
+    ) -> None:
+        self.fixtures = fixtures
+        self.block_seconds = blocksize / SAMPLE_RATE
+        self.nlu = SimpleRuleNLU()
+        self.dm = dm
+        self.context = sessions.get(session_id)
+        self.sink = sink
+        self.stats = stats
+        self.rng = random.Random(session_id)
+        self.block_due = 0.0
+
+        self.asr = ASR(MODEL_PATH, SAMPLE_RATE, blocksize, max_alternatives=ASR_MAX_ALTERNATIVES)
+        self.asr.model = model
+        self.asr.prepare()
+        self.asr.set_hypotheses_callback(self.on_hypotheses)
+
+    def on_hypotheses(self, hypotheses: list) -> None:
+        try:
+            intent = self.nlu.parse_nbest(hypotheses, self.context)
+            response = self.dm.handle_utterance(intent, hypotheses[0].text, self.context)
+            if response:
+                speak_utterance(self.sink, response)
+        except Exception:
+            self.stats.error()
+        else:
+            self.stats.turn(time.monotonic() - self.block_due)
+
+    # feed fixtures at the pace a microphone would deliver them
+    def run(self, stop: threading.Event) -> None:
+        due = time.monotonic() + self.rng.uniform(0, self.block_seconds * 4)
+        while not stop.is_set():
+            for block in self.fixtures[self.rng.randrange(len(self.fixtures))]:
+                due += self.block_seconds
+                delay = due - time.monotonic()
+                if delay > 0:
+                    if stop.wait(delay):
+                        return
+                else:
+                    self.stats.lag(-delay)
+                self.block_due = due
+                self.asr.process(block)
+
+
+def read_fixture(path: str, blocksize: int, padding: float) -> List[bytes]:
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise SystemExit(f"{path}: expected {SAMPLE_RATE} Hz mono 16-bit audio")
+        frames = wav.readframes(wav.getnframes())
+    # trailing silence so the recognizer detects the end of the utterance
+    frames += b"\0\0" * int(SAMPLE_RATE * padding)
+    step = blocksize * 2
+    return [frames[i:i + step] for i in range(0, len(frames), step)]
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    # nearest rank
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run_level(count: int, make_session: Any, warmup: float, duration: float, verbose: bool) -> Dict[str, Any]:
+    stats = LevelStats()
+    sessions = [make_session(f"load-{count}-{i}", stats) for i in range(count)]
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=s.run, args=(stop,), name=f"session-{i}", daemon=True)
+        for i, s in enumerate(sessions)
+    ]
+
+    # the recognizer prints every utterance, which would dominate the output
+    quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        for thread in threads:
+            thread.start()
+        time.sleep(warmup)
+        stats.recording = True
+        cpu_start, wall_start = time.process_time(), time.monotonic()
+        time.sleep(duration)
+        stats.recording = False
+        cpu, wall = time.process_time() - cpu_start, time.monotonic() - wall_start
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    latencies = stats.latencies
+    attempts = len(latencies) + stats.errors
+    return {
+        "sessions": count,
+        "turns": len(latencies),
+        "turns_per_second": len(latencies) / wall,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "max_lag": stats.max_lag,
+        "errors": stats.errors,
+        "error_rate": stats.errors / attempts if attempts else 0.0,
+        "busy_cores": cpu / wall,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--audio", nargs="+", required=True, help="16 kHz mono 16-bit WAV fixtures, one utterance each")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--blocksize", type=int, default=BLOCKSIZE)
+    parser.add_argument("--padding", type=float, default=1.0, help="seconds of silence after each fixture")
+    parser.add_argument("--start-sessions", type=int, default=1)
+    parser.add_argument("--max-sessions", type=int, default=256)
+    parser.add_argument("--growth", type=float, default=2.0, help="factor between load levels")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds per level before measuring")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds per level")
+    parser.add_argument("--slo", type=float, default=1.0, help="p99 turn latency objective in seconds")
+    parser.add_argument("--max-error-rate", type=float, default=0.0,
+                        help="fraction of turns that may fail before a level counts as saturated")
+    parser.add_argument("--max-lag", type=float, default=0.5, help="seconds a session may fall behind real time")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="stub API response delay in seconds")
+    parser.add_argument("--tts", choices=("espeak", "null"), default="espeak",
+                        help="render responses with eSpeak NG into the null sink, or skip synthesis")
+    parser.add_argument("--verbose", action="store_true", help="keep the recognizer's per-utterance output")
+    args = parser.parse_args()
+
+    fixtures = [read_fixture(path, args.blocksize, args.padding) for path in args.audio]
+
+    server = start_stub_server(args.api_latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    journal_dir = tempfile.mkdtemp(prefix="loadgen-")
+    journal = CalendarJournal(
+        os.path.join(journal_dir, "calendar_journal.jsonl"), RestCalendarClient(f"{base_url}/calendar.php")
+    )
+    journal.start()
+    weather = RestWeatherClient(f"{base_url}/weather.php")
+    calendar = JournaledCalendarClient(journal)
+
+    renderer = None
+    if args.tts == "espeak":
+        from voice_assistant.tts import EspeakSynthesizer
+        renderer = EspeakSynthesizer()
+
+    shared = ASR(args.model, SAMPLE_RATE, args.blocksize)
+    shared.load()
+    store = SessionStore(max_sessions=args.max_sessions * 2, idle_timeout=3600.0)
+
+    def make_session(session_id: str, stats: LevelStats) -> Session:
+        dm = SimpleDialogueManager(weather_client=weather, calendar_client=calendar)
+        return Session(session_id, shared.model, fixtures, args.blocksize, dm, store, NullSink(renderer), stats)
+
+    cores = os.cpu_count() or 1
+    print(f"fixtures: {len(fixtures)}, cores: {cores}, objective: p99 <= {args.slo:.2f} s, "
+          f"lag <= {args.max_lag:.2f} s, errors <= {100 * args.max_error_rate:.1f} %")
+    print(f"{'sessions':>8}  {'turns/s':>8}  {'p50 s':>7}  {'p90 s':>7}  {'p99 s':>7}  "
+          f"{'max lag s':>9}  {'errors':>6}  {'busy cores':>10}")
+
+    sustained: Optional[Dict[str, Any]] = None
+    saturated: Optional[Dict[str, Any]] = None
+    count = args.start_sessions
+    try:
+        while count <= args.max_sessions:
+            level = run_level(count, make_session, args.warmup, args.duration, args.verbose)
+            print(f"{level['sessions']:>8}  {level['turns_per_second']:>8.2f}  {level['p50']:>7.3f}  "
+                  f"{level['p90']:>7.3f}  {level['p99']:>7.3f}  {level['max_lag']:>9.3f}  "
+                  f"{level['errors']:>6}  {level['busy_cores']:>10.2f}")
+            if (
+                level["turns"]
+                and level["p99"] <= args.slo
+                and level["max_lag"] <= args.max_lag
+                and level["error_rate"] <= args.max_error_rate
+            ):
+                sustained = level
+            else:
+                saturated = level
+                break
+            count = max(count + 1, int(count * args.growth))
+    finally:
+        journal.stop()
+        server.shutdown()
+        shutil.rmtree(journal_dir, ignore_errors=True)
+
+    print()
+    if sustained is None:
+        print(f"saturated at the first level ({args.start_sessions} sessions)")
+        return
+    print(f"sustained sessions:        {sustained['sessions']} "
+          f"(p99 {sustained['p99']:.3f} s, {sustained['busy_cores']:.2f} busy cores)")
+    print(f"sessions per core:         {sustained['sessions'] / cores:.2f} "
+          f"({sustained['sessions'] / max(sustained['busy_cores'], 1e-9):.2f} per busy core)")
+    if saturated is not None:
+        print(f"saturation point:          {saturated['sessions']} sessions "
+              f"(p99 {saturated['p99']:.3f} s, max lag {saturated['max_lag']:.3f} s, "
+              f"{saturated['errors']} errors)")
+    else:
+        print(f"saturation point:          not reached up to {args.max_sessions} sessions")
+
+
+if __name__ == "__main__":
+    main()
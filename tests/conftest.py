@@ -0,0 +1,16 @@
+import pytest
+
+
+class FakeClock:
+    """Manually advanced replacement for time.time / time.monotonic."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,74 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from voice_assistant.asr.capture import CaptureFrontEnd, Downmixer, PolyphaseResampler
+
+
+def tone(freq, rate, seconds=1.0, amplitude=10000.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+def dominant_frequency(x, rate):
+    spectrum = np.abs(np.fft.rfft(x * np.hanning(len(x))))
+    return np.argmax(spectrum) * rate / len(x)
+
+
+@pytest.mark.parametrize("in_rate", [48000, 44100, 22050, 8000])
+def test_streaming_matches_one_shot(in_rate):
+    x = tone(440, in_rate)
+    whole = PolyphaseResampler(in_rate, 16000).process(x)
+
+    streamed = PolyphaseResampler(in_rate, 16000)
+    sizes = [1, 7, 333, 1024, 4800, 17]
+    parts, pos, i = [], 0, 0
+    while pos < len(x):
+        parts.append(streamed.process(x[pos:pos + sizes[i % len(sizes)]]))
+        pos += sizes[i % len(sizes)]
+        i += 1
+
+    np.testing.assert_allclose(np.concatenate(parts), whole, atol=1e-2)
+    assert abs(len(whole) - 16000) <= 1
+
+
+def test_resampling_preserves_tone():
+    out = PolyphaseResampler(48000, 16000).process(tone(1000, 48000))
+    assert dominant_frequency(out, 16000) == pytest.approx(1000, abs=2)
+    # steady-state amplitude after the filter has settled
+    assert np.abs(out[1000:-1000]).max() == pytest.approx(10000, rel=0.02)
+
+
+def test_resampling_removes_content_above_nyquist():
+    out = PolyphaseResampler(48000, 16000).process(tone(12000, 48000))
+    assert np.abs(out[1000:-1000]).max() < 100
+
+
+def test_downmix_averages_channels():
+    block = np.array([[100, 300], [-200, 0]], dtype=np.int16)
+    np.testing.assert_allclose(Downmixer(2).process(block), [200, -100])
+
+
+def test_delay_and_sum_aligns_channels():
+    x = np.arange(1, 21, dtype=np.float32)
+    # channel 1 hears the source 3 samples earlier than channel 0
+    block = np.stack([np.concatenate([np.zeros(3), x[:-3]]), x], axis=1).astype(np.int16)
+    mix = Downmixer(2, delays=[0, 3])
+    out = np.concatenate([mix.process(block[:8]), mix.process(block[8:])])
+    np.testing.assert_allclose(out[3:], np.concatenate([np.zeros(3), x[:-3]])[3:])
+
+
+def test_frontend_outputs_model_rate_mono_pcm():
+    frontend = CaptureFrontEnd(16000, samplerate=48000, channels=2).configure()
+    assert not frontend.passthrough
+    assert frontend.device_blocksize(8000) == 24000
+
+    stereo = np.stack([tone(440, 48000), tone(440, 48000)], axis=1).astype(np.int16)
+    pcm = b"".join(frontend.process(stereo[i:i + 24000]) for i in range(0, len(stereo), 24000))
+    out = np.frombuffer(pcm, dtype="<i2")
+    assert abs(len(out) - 16000) <= 1
+    assert dominant_frequency(out.astype(float), 16000) == pytest.approx(440, abs=2)
+
+
+def test_frontend_passthrough_for_model_format():
+    assert CaptureFrontEnd(16000, samplerate=16000, channels=1).configure().passthrough
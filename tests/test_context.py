@@ -0,0 +1,58 @@
+from voice_assistant.dialogue.context import SessionStore
+from voice_assistant.interfaces import Intent
+from voice_assistant.nlu.rule_based import SimpleRuleNLU
+
+
+def test_weather_follow_up_carries_slots():
+    nlu = SimpleRuleNLU()
+    store = SessionStore()
+    ctx = store.get("kitchen")
+
+    first = nlu.parse("what is the weather in berlin", ctx)
+    assert first.slots == {"location": "Berlin"}
+    ctx.remember(first)
+
+    follow_up = nlu.parse("and tomorrow?", ctx)
+    assert follow_up.name == "weather_query"
+    assert follow_up.slots == {"location": "Berlin", "day": 1}
+
+    # other sessions do not see the carried location
+    assert nlu.parse("and tomorrow?", store.get("office")).name == "fallback"
+
+
+def test_non_places_are_not_locations():
+    nlu = SimpleRuleNLU()
+    for text in (
+        "what is the weather for my trip",
+        "what is the forecast for the weekend",
+        "what is the weather for next week",
+        "weather for this afternoon",
+        "tell me about a forecast",
+        "is it going to rain in our area",
+    ):
+        assert "location" not in nlu.parse(text).slots, text
+
+    # a real place later in the sentence is still found
+    assert nlu.parse("what is the weather for my trip in paris").slots["location"] == "Paris"
+    assert nlu.parse("weather for new york this weekend").slots["location"] == "New York"
+
+
+def test_store_evicts_least_recently_used():
+    store = SessionStore(max_sessions=2)
+    store.get("a")
+    store.get("b")
+    store.get("a")
+    store.get("c")
+    assert "a" in store and "c" in store
+    assert "b" not in store
+
+
+def test_store_evicts_idle_sessions(clock):
+    store = SessionStore(idle_timeout=10.0, clock=clock)
+    store.get("a").remember(Intent(name="greet", slots={}))
+    clock.now = 5.0
+    store.get("b")
+    clock.now = 12.0
+    store.get("b")
+    assert "a" not in store
+    assert len(store) == 1
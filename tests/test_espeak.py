@@ -0,0 +1,46 @@
+import sys
+import threading
+import time
+import types
+
+from voice_assistant.tts.espeak_tts import EspeakSynthesizer
+
+
+class FakeStream:
+    def __init__(self, played, samplerate, **kwargs):
+        self.played = played
+        self.samplerate = samplerate
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, pcm):
+        self.played.append(pcm)
+
+
+def test_tail_is_synthesized_while_the_prefix_plays(monkeypatch):
+    played = []
+    fake_sd = types.SimpleNamespace(RawOutputStream=lambda **kwargs: FakeStream(played, **kwargs))
+    monkeypatch.setitem(sys.modules, "sounddevice", fake_sd)
+
+    synth = EspeakSynthesizer(binary="espeak-ng")
+    synth._prefix_cache["It is "] = (22050, b"prefix")
+    rendering = threading.Event()
+
+    # the tail only finishes once the prefix has been handed to the stream
+    def synthesize(text):
+        rendering.set()
+        for _ in range(500):
+            if played:
+                return 22050, b"tail"
+            time.sleep(0.01)
+        raise AssertionError("prefix was not played while the tail was rendered")
+
+    monkeypatch.setattr(synth, "synthesize", synthesize)
+    synth.speak_parts("It is ", "sunny")
+
+    assert rendering.is_set()
+    assert played == [b"prefix", b"tail"]
@@ -0,0 +1,162 @@
+import threading
+import time
+
+from voice_assistant.apis.common import APIError
+from voice_assistant.apis.journal import CalendarJournal, JournaledCalendarClient
+
+
+class RecordingClient:
+    """Fake remote calendar that records calls; can be blocked or made to fail."""
+
+    def __init__(self) -> None:
+        self.calls = []
+        self.events = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail_with = None
+        self.done = threading.Semaphore(0)
+
+    def create_event(self, **payload):
+        return self.call("create", payload)
+
+    def update_event(self, event_id, **payload):
+        return self.call("update", {"id": event_id, **payload})
+
+    def delete_event(self, event_id):
+        return self.call("delete", {"id": event_id})
+
+    def list_events(self):
+        return self.events
+
+    def call(self, op, payload):
+        self.gate.wait()
+        try:
+            if self.fail_with is not None:
+                raise self.fail_with
+            self.calls.append((op, payload))
+            return payload
+        finally:
+            self.done.release()
+
+
+def wait_for(client, n):
+    for _ in range(n):
+        assert client.done.acquire(timeout=5)
+
+
+def test_writes_are_replayed_in_order_and_updates_coalesced(tmp_path):
+    client = RecordingClient()
+    journal = CalendarJournal(str(tmp_path / "journal.jsonl"), client, retry_delay=0.01)
+    calendar = JournaledCalendarClient(journal)
+    client.gate.clear()
+    journal.start()
+    try:
+        calendar.create_event(title="a", description="", start_time="s", end_time="e", location="")
+        calendar.update_event(event_id=7, title="draft")
+        calendar.update_event(event_id=7, location="Room 1")
+        calendar.update_event(event_id=7, title="final")
+        calendar.delete_event(event_id=9)
+        client.gate.set()
+        wait_for(client, 3)
+    finally:
+        journal.stop()
+
+    assert client.calls == [
+        ("create", {"title": "a", "description": "", "start_time": "s", "end_time": "e", "location": ""}),
+        ("update", {"id": 7, "title": "final", "location": "Room 1"}),
+        ("delete", {"id": 9}),
+    ]
+
+
+def test_pending_writes_survive_restart(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    offline = RecordingClient()
+    offline.fail_with = ConnectionError("offline")
+    journal = CalendarJournal(path, offline, retry_delay=10)
+    journal.start()
+    JournaledCalendarClient(journal).update_event(event_id=3, title="x")
+    wait_for(offline, 1)
+    journal.stop()
+
+    online = RecordingClient()
+    journal = CalendarJournal(path, online)
+    journal.start()
+    try:
+        wait_for(online, 1)
+    finally:
+        journal.stop()
+    assert online.calls == [("update", {"id": 3, "title": "x"})]
+
+    # everything is acknowledged, nothing is replayed a second time
+    assert not CalendarJournal(path, RecordingClient()).pending
+
+
+def test_rejected_write_is_dropped(tmp_path):
+    client = RecordingClient()
+    client.fail_with = APIError(400, "API error 400: bad request")
+    journal = CalendarJournal(str(tmp_path / "journal.jsonl"), client, retry_delay=0.01)
+    journal.start()
+    try:
+        JournaledCalendarClient(journal).delete_event(event_id=1)
+        wait_for(client, 1)
+    finally:
+        journal.stop()
+    assert not CalendarJournal(journal.path, RecordingClient()).pending
+
+
+def read_journal(path):
+    with open(path, encoding="utf-8") as fh:
+        return fh.read()
+
+
+class FlakyCreateClient(RecordingClient):
+    """Stores the first created event and then fails with a server error."""
+
+    def create_event(self, **payload):
+        self.events.append(payload)
+        if len(self.events) == 1:
+            self.done.release()
+            raise APIError(503, "API error 503: unavailable")
+        return super().create_event(**payload)
+
+
+def test_create_failing_with_server_error_is_not_duplicated(tmp_path):
+    client = FlakyCreateClient()
+    journal = CalendarJournal(str(tmp_path / "journal.jsonl"), client, retry_delay=0.01)
+    journal.start()
+    try:
+        JournaledCalendarClient(journal).create_event(
+            title="a", description="", start_time="s", end_time="e", location=""
+        )
+        wait_for(client, 1)
+        # the retry finds the event in the calendar and marks the record done
+        end = time.monotonic() + 5
+        while '"done"' not in read_journal(journal.path):
+            assert time.monotonic() < end
+            time.sleep(0.01)
+    finally:
+        journal.stop()
+    assert len(client.events) == 1
+    assert client.calls == []
+
+
+def test_compaction_keeps_records_unchanged_across_restarts(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    offline = RecordingClient()
+    offline.fail_with = ConnectionError("offline")
+    journal = CalendarJournal(path, offline, retry_delay=10)
+    journal.start()
+    calendar = JournaledCalendarClient(journal)
+    calendar.update_event(event_id=7, title="draft")
+    calendar.update_event(event_id=7, location="Room 1")
+    calendar.delete_event(event_id=7)
+    journal.stop()
+    with open(path, encoding="utf-8") as fh:
+        original = fh.read()
+
+    for _ in range(2):
+        journal = CalendarJournal(path, RecordingClient())
+        assert [r["seqs"] for r in journal.pending.values()] == [[1, 2, 3]]
+        journal.stop()
+        with open(path, encoding="utf-8") as fh:
+            assert fh.read() == original
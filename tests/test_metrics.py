@@ -0,0 +1,59 @@
+import json
+import urllib.request
+
+from voice_assistant.metrics import MetricsServer, Registry
+from voice_assistant.profiler import SamplingProfiler
+
+
+def test_prometheus_text_format():
+    registry = Registry()
+    registry.counter("turns_total", "Handled turns", labels=("intent",)).inc(intent="greet")
+    registry.gauge("queue_depth", "Queued blocks").set(3)
+    hist = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    hist.observe(0.05)
+    hist.observe(0.5)
+
+    text = registry.render_prometheus()
+    assert "# TYPE turns_total counter" in text
+    assert 'turns_total{intent="greet"} 1.0' in text
+    assert "queue_depth 3.0" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1.0' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2.0' in text
+    assert "latency_seconds_count 2.0" in text
+
+
+def test_http_endpoint_and_profiler_toggle():
+    registry = Registry()
+    registry.counter("pings_total", "Pings").inc()
+    profiler = SamplingProfiler(thread_names=("MainThread",))
+    server = MetricsServer("127.0.0.1", 0, registry=registry, profiler=profiler)
+    server.start()
+    base = f"http://127.0.0.1:{server.port}"
+    try:
+        with urllib.request.urlopen(base + "/metrics") as resp:
+            assert "pings_total 1.0" in resp.read().decode()
+        with urllib.request.urlopen(base + "/metrics.json") as resp:
+            assert json.load(resp)["metrics"]["pings_total"]["values"][0]["value"] == 1.0
+        with urllib.request.urlopen(base + "/profile/start") as resp:
+            assert "running: True" in resp.read().decode()
+        with urllib.request.urlopen(base + "/profile/stop") as resp:
+            assert "running: False" in resp.read().decode()
+    finally:
+        profiler.stop()
+        server.stop()
+
+
+def test_profiler_restart_runs_a_single_sampler():
+    profiler = SamplingProfiler(thread_names=("MainThread",), interval=0.2)
+    profiler.start()
+    first = profiler.thread
+    profiler.stop()
+    profiler.start()
+    try:
+        first.join(1.0)
+        assert not first.is_alive()
+        assert profiler.running and profiler.thread.is_alive()
+    finally:
+        profiler.stop()
+    profiler.thread.join(1.0)
+    assert not profiler.running
@@ -1,3 +1,8 @@
+from datetime import date, timedelta
+
+from voice_assistant.asr.hypotheses import parse_result
+from voice_assistant.dialogue.manager import SimpleDialogueManager
+from voice_assistant.interfaces import CalendarClient, Hypothesis, Intent
 from voice_assistant.nlu.rule_based import SimpleRuleNLU
 
 
@@ -8,3 +13,124 @@ def test_nlu_rules_basic():
     assert nlu.parse("please exit now").name == "exit"
     assert nlu.parse("something random").name == "fallback"
 
+
+
+def test_nlu_nbest_rescoring():
+    nlu = SimpleRuleNLU()
+    hypotheses = [
+        Hypothesis("what is the whether", 0.40),
+        Hypothesis("what is the weather", 0.35),
+        Hypothesis("what is the weather today", 0.25),
+    ]
+    intent = nlu.parse_nbest(hypotheses)
+    assert intent.name == "weather_query"
+    assert abs(intent.confidence - 0.6) < 1e-9
+
+
+def test_vosk_alternatives_become_posteriors():
+    result = {"alternatives": [
+        {"text": "stop", "confidence": 10.0},
+        {"text": "shop", "confidence": 10.0},
+    ]}
+    hypotheses = parse_result(result)
+    assert [h.confidence for h in hypotheses] == [0.5, 0.5]
+    assert parse_result({"text": "hi", "result": [{"word": "hi", "conf": 0.8}]})[0].confidence == 0.8
+
+
+def test_low_confidence_turn_is_reprompted():
+    dm = SimpleDialogueManager()
+    hypotheses = [Hypothesis("stop", 0.4), Hypothesis("shop", 0.3), Hypothesis("hello shop", 0.3)]
+    intent = SimpleRuleNLU().parse_nbest(hypotheses)
+    assert intent.name == "exit"
+    assert dm.handle(intent, "stop").startswith("Sorry, I'm not sure I understood")
+
+
+def test_calendar_create_slots():
+    nlu = SimpleRuleNLU()
+    intent = nlu.parse("create a meeting tomorrow at three")
+    assert intent.name == "calendar_query"
+    assert intent.slots == {"action": "create", "title": "Meeting", "day": 1, "time": "15:00"}
+
+    assert nlu.parse("add an appointment at ten thirty").slots["time"] == "10:30"
+    assert nlu.parse("add an appointment at 9:45").slots["time"] == "09:45"
+
+
+def test_calendar_time_periods():
+    nlu = SimpleRuleNLU()
+    assert nlu.parse("book a meeting at three a m").slots["time"] == "03:00"
+    assert nlu.parse("book a meeting at eight p m").slots["time"] == "20:00"
+    assert nlu.parse("book a meeting at eight").slots["time"] == "08:00"
+    assert nlu.parse("book a meeting at twelve a m").slots["time"] == "00:00"
+    assert nlu.parse("book a meeting at twelve p m").slots["time"] == "12:00"
+    assert nlu.parse("book a meeting at six in the evening").slots["time"] == "18:00"
+    assert nlu.parse("book a meeting at 25").slots.get("time") is None
+
+
+def test_schedule_query_is_not_a_create():
+    nlu = SimpleRuleNLU()
+    assert nlu.parse("schedule a meeting tomorrow").slots["action"] == "create"
+    query = nlu.parse("what is on my schedule tomorrow")
+    assert query.name == "calendar_query"
+    assert "action" not in query.slots
+
+
+def test_only_a_leading_command_verb_is_a_create():
+    nlu = SimpleRuleNLU()
+    assert nlu.parse("please add a meeting at ten").slots["action"] == "create"
+    assert nlu.parse("can you set up a meeting tomorrow").slots["action"] == "create"
+    for text in (
+        "what's new on my calendar",
+        "can you make it to the meeting",
+        "put off my meeting",
+        "is there a meeting i should add notes to",
+    ):
+        intent = nlu.parse(text)
+        assert intent.name == "calendar_query", text
+        assert "action" not in intent.slots, text
+
+
+class StubCalendar(CalendarClient):
+    def __init__(self) -> None:
+        self.created = []
+
+    def create_event(self, **kwargs):
+        self.created.append(kwargs)
+        return kwargs
+
+    def get_event(self, **kwargs):
+        return {}
+
+    def update_event(self, **kwargs):
+        return {}
+
+    def delete_event(self, **kwargs):
+        return {}
+
+    def list_events(self, **kwargs):
+        return []
+
+
+def test_calendar_create_response():
+    calendar = StubCalendar()
+    dm = SimpleDialogueManager(calendar_client=calendar)
+    text = "create an appointment tomorrow at three"
+    answer = dm.handle(SimpleRuleNLU().parse(text), text)
+
+    assert answer == "Okay, I added an appointment tomorrow at 15:00."
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    assert calendar.created == [{
+        "title": "Appointment",
+        "description": text,
+        "start_time": f"{tomorrow}T15:00",
+        "end_time": f"{tomorrow}T16:00",
+        "location": "",
+    }]
+
+
+def test_calendar_without_client_or_create_action():
+    intent = Intent(name="calendar_query", slots={"action": "create"})
+    assert SimpleDialogueManager().handle(intent, "") == "Calendar API is not available yet."
+    calendar = StubCalendar()
+    dm = SimpleDialogueManager(calendar_client=calendar)
+    assert dm.handle(Intent(name="calendar_query", slots={}), "") == "I can only add new calendar entries for now."
+    assert calendar.created == []
@@ -0,0 +1,11 @@
+import subprocess
+import sys
+
+
+def test_app_import_does_not_load_backends():
+    code = (
+        "import sys, voice_assistant.app; "
+        "print(','.join(m for m in ('requests', 'vosk', 'sounddevice', 'pyttsx3') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
@@ -0,0 +1,57 @@
+import pytest
+
+from voice_assistant.dialogue.manager import SimpleDialogueManager
+from voice_assistant.dialogue.templates import ResponseTemplate
+from voice_assistant.interfaces import Intent, WeatherClient
+
+
+class StubWeather(WeatherClient):
+    def current(self, location):
+        return {
+            "place": location,
+            "forecast": [
+                {"day": "Monday", "weather": "sunny", "temperature": {"min": 3, "max": 11}},
+                {"day": "Tuesday", "weather": "rainy", "temperature": {"min": 1, "max": 7}},
+            ],
+        }
+
+
+def test_template_splits_static_prefix():
+    template = ResponseTemplate("Hi {name}, it is {time}.", static_fields=("name",))
+    utterance = template.render(name="Ada", time="09:00")
+    assert utterance.prefix == "Hi Ada, it is "
+    assert utterance.tail == "09:00."
+    assert utterance.text == "Hi Ada, it is 09:00."
+
+
+def test_template_applies_format_spec_and_conversion():
+    template = ResponseTemplate("{place!r} is at {temp:.1f} degrees, {trend:>6}.", static_fields=("place",))
+    utterance = template.render(place="Marburg", temp=7.25, trend="up")
+    assert utterance.prefix == "'Marburg' is at "
+    assert utterance.tail == "7.2 degrees,     up."
+    assert utterance.text == "{place!r} is at {temp:.1f} degrees, {trend:>6}.".format(
+        place="Marburg", temp=7.25, trend="up"
+    )
+
+    # the same field may be formatted differently in two places
+    assert ResponseTemplate("{t:.0f} ({t:.2f})").render(t=2.5).text == "2 (2.50)"
+
+
+def test_template_rejects_what_it_cannot_render():
+    with pytest.raises(ValueError):
+        ResponseTemplate("Hi {}.")
+    with pytest.raises(ValueError):
+        ResponseTemplate("{temp:{width}}")
+
+
+def test_weather_response_prefix_and_tail():
+    dm = SimpleDialogueManager(weather_client=StubWeather())
+    intent = Intent(name="weather_query", slots={"day": 1})
+
+    utterance = dm.handle_utterance(intent, "weather tomorrow")
+    assert utterance.prefix == "The weather in Marburg tomorrow is "
+    assert utterance.text == (
+        "The weather in Marburg tomorrow is rainy, with temperatures between 1 and 7 degrees Celsius."
+    )
+    assert utterance.prefix in dm.warm_prefixes()
+    assert dm.handle(Intent(name="greet", slots={}), "hi") == "Hello! How can I help?"
@@ -0,0 +1,224 @@
+import threading
+import time
+
+import pytest
+
+from voice_assistant.tts.pool import SynthesizerPool
+
+
+class FakeSynth:
+    def __init__(self, delay=0.0, fail=False) -> None:
+        self.delay = delay
+        self.fail = fail
+        self.spoken = []
+        self.threads = set()
+        self.release = threading.Event()
+        self.hang = False
+        self.cancelled = 0
+
+    def speak(self, text):
+        self.threads.add(threading.current_thread().name)
+        if self.hang:
+            self.release.wait(self.hang)
+            if self.cancelled:
+                return
+        if self.fail:
+            raise RuntimeError("engine broken")
+        time.sleep(self.delay)
+        self.spoken.append(text)
+
+    def cancel(self):
+        self.cancelled += 1
+        self.release.set()
+
+
+class UncancellableSynth(FakeSynth):
+    cancel = None
+
+
+class GatedSynth(FakeSynth):
+    """Reports its first audio to the pool, like the real backends."""
+
+    def __init__(self, synthesis=0.0, playback=0.0) -> None:
+        super().__init__()
+        self.synthesis = synthesis
+        self.playback = playback
+        self.begin_audio = None
+        self.dropped = []
+
+    def speak(self, text):
+        time.sleep(self.synthesis)
+        if not self.begin_audio():
+            self.dropped.append(text)
+            return
+        time.sleep(self.playback)
+        self.spoken.append(text)
+
+
+def make_pool(clock, *synths, **kwargs):
+    kwargs.setdefault("deadline", 0.2)
+    kwargs.setdefault("deadline_per_char", 0.0)
+    kwargs.setdefault("playback_per_char", 0.0)
+    pool = SynthesizerPool(
+        [(f"b{i}", lambda s=s: s) for i, s in enumerate(synths)],
+        clock=clock,
+        **kwargs,
+    )
+    pool.wait_ready(1.0)
+    for backend in pool.backends:
+        backend.ready.result(1.0)
+    return pool
+
+
+def test_first_backend_speaks_on_its_own_thread(clock):
+    primary, standby = FakeSynth(), FakeSynth()
+    pool = make_pool(clock, primary, standby)
+    pool.speak("hello")
+    pool.speak("again")
+    assert primary.spoken == ["hello", "again"]
+    assert standby.spoken == []
+    assert primary.threads == {"tts-b0"}
+
+
+def test_hung_backend_fails_over_within_deadline(clock):
+    primary, standby = FakeSynth(), FakeSynth()
+    primary.hang = 5
+    pool = make_pool(clock, primary, standby)
+
+    start = time.monotonic()
+    pool.speak("hello")
+    assert time.monotonic() - start < 1.0
+    assert standby.spoken == ["hello"]
+    assert primary.spoken == []
+    assert primary.cancelled == 1
+
+    # benched until the cooldown has passed
+    pool.speak("next")
+    assert standby.spoken == ["hello", "next"]
+
+
+def test_late_backend_without_cancel_is_not_talked_over(clock):
+    primary, standby = UncancellableSynth(), FakeSynth()
+    primary.hang = 0.3
+    pool = make_pool(clock, primary, standby)
+
+    pool.speak("hello")
+    assert primary.spoken == ["hello"]
+    assert standby.spoken == []
+    # the missed deadline still benches it
+    assert pool.backends[0].failures == 1
+
+
+def test_hung_backend_without_cancel_fails_over_after_grace(clock):
+    primary, standby = UncancellableSynth(), FakeSynth()
+    primary.hang = 5
+    pool = make_pool(clock, primary, standby)
+
+    start = time.monotonic()
+    pool.speak("hello")
+    assert 0.4 <= time.monotonic() - start < 1.0
+    assert standby.spoken == ["hello"]
+    assert pool.backends[0].stuck is not None
+    primary.release.set()
+
+
+def test_failing_backend_is_benched_with_backoff(clock):
+    primary, standby = FakeSynth(fail=True), FakeSynth()
+    pool = make_pool(clock, primary, standby, cooldown=5.0)
+
+    pool.speak("one")
+    assert standby.spoken == ["one"]
+    assert pool.backends[0].retry_at == 5.0
+
+    # the measured standby keeps the lead; the primary is only tried again when it fails
+    clock.now = 6.0
+    standby.fail = True
+    with pytest.raises(RuntimeError):
+        pool.speak("two")
+    assert pool.backends[0].retry_at == 16.0
+    assert pool.backends[1].retry_at == 11.0
+
+
+def test_fastest_healthy_backend_is_preferred(clock):
+    slow, fast = FakeSynth(delay=0.05), FakeSynth()
+    pool = make_pool(clock, slow, fast, cooldown=1.0)
+
+    slow.fail = True
+    pool.speak("probe")
+    slow.fail = False
+    clock.now = 10.0
+    pool.speak("measure")
+    assert slow.spoken == []
+    assert fast.spoken == ["probe", "measure"]
+
+    # once both are measured, the faster one wins
+    pool.backends[0].first_audio = 1.0
+    assert pool.ranked()[0].name == "b1"
+
+
+def test_slow_synthesis_fails_over_before_any_audio(clock):
+    primary, standby = GatedSynth(synthesis=0.5), GatedSynth()
+    pool = make_pool(clock, primary, standby)
+
+    start = time.monotonic()
+    pool.speak("hello")
+    assert time.monotonic() - start < 0.45
+    assert standby.spoken == ["hello"]
+    time.sleep(0.4)
+    # the primary finished rendering after it was abandoned and stayed silent
+    assert primary.dropped == ["hello"]
+    assert primary.spoken == []
+
+
+def test_long_playback_is_not_cut_off(clock):
+    primary, standby = GatedSynth(playback=0.5), GatedSynth()
+    pool = make_pool(clock, primary, standby, playback_per_char=0.2)
+
+    pool.speak("hello")
+    assert primary.spoken == ["hello"]
+    assert standby.spoken == []
+    assert pool.backends[0].failures == 0
+    # ranked by time to first audio, not by the length of the playback
+    assert pool.backends[0].first_audio < 0.1
+
+
+def test_all_backends_failing_raises(clock):
+    pool = make_pool(clock, FakeSynth(fail=True), FakeSynth(fail=True))
+    with pytest.raises(RuntimeError, match="engine broken"):
+        pool.speak("hello")
+
+
+def test_failed_initialization_falls_back_to_standby(clock):
+    def broken():
+        raise RuntimeError("no espeak")
+
+    standby = FakeSynth()
+    pool = SynthesizerPool([("espeak", broken), ("pyttsx", lambda: standby)], clock=clock)
+    assert pool.wait_ready(1.0) == "pyttsx"
+    pool.speak_parts("The weather is ", "sunny.")
+    assert standby.spoken == ["The weather is sunny."]
+
+
+def test_first_initialized_backend_is_used_while_preferred_one_loads(clock):
+    loading = threading.Event()
+    preferred, standby = FakeSynth(), FakeSynth()
+
+    def slow():
+        loading.wait(5)
+        return preferred
+
+    pool = SynthesizerPool([("espeak", slow), ("pyttsx", lambda: standby)], clock=clock)
+    start = time.monotonic()
+    assert pool.wait_ready(2.0) == "pyttsx"
+    assert time.monotonic() - start < 1.0
+    pool.speak("hello")
+    assert standby.spoken == ["hello"]
+    loading.set()
+
+
+def test_wait_ready_gives_up_after_timeout(clock):
+    loading = threading.Event()
+    pool = SynthesizerPool([("espeak", lambda: loading.wait(5))], clock=clock)
+    with pytest.raises(RuntimeError, match="espeak: not ready within 0.1 s"):
+        pool.wait_ready(0.1)
+    loading.set()
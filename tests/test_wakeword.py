@@ -0,0 +1,56 @@
+import json
+
+from voice_assistant.asr import ASR
+from voice_assistant.asr.wakeword import WakeWordGate
+
+
+class FakeRecognizer:
+    """Returns a scripted transcript for each audio block (block content is the text)."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.last = ""
+
+    def AcceptWaveform(self, data):
+        self.calls += 1
+        self.last = data.decode()
+        return bool(self.last)
+
+    def Result(self):
+        return json.dumps({"text": self.last})
+
+    def PartialResult(self):
+        return json.dumps({"partial": ""})
+
+    def Reset(self):
+        self.last = ""
+
+
+def make_asr(clock):
+    asr = ASR("unused", wake_phrases=("hey assistant",))
+    asr.rec = FakeRecognizer()
+    asr.wake = WakeWordGate(FakeRecognizer(), asr.wake_phrases, window=5.0, clock=clock)
+    heard = []
+    asr.set_callback(heard.append)
+    return asr, heard
+
+
+def test_full_decoding_only_after_wake_phrase(clock):
+    asr, heard = make_asr(clock)
+
+    asr.process(b"please stop the music")
+    assert heard == []
+    assert asr.rec.calls == 0
+
+    asr.process(b"hey assistant what time is it")
+    assert heard == ["what time is it"]
+
+    clock.now = 10.0
+    asr.process(b"close the window")
+    assert heard == ["what time is it"]
+
+
+def test_strip_wake_phrase():
+    gate = WakeWordGate(FakeRecognizer(), ("hey assistant", "okay assistant"))
+    assert gate.strip("okay assistant weather tomorrow") == "weather tomorrow"
+    assert gate.strip("weather tomorrow") == "weather tomorrow"
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from voice_assistant.apis.weather_prefetch import WeatherPrefetcher
+from voice_assistant.dialogue.manager import SimpleDialogueManager
+from voice_assistant.interfaces import Intent, WeatherClient
+
+
+class CountingWeather(WeatherClient):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def current(self, location):
+        self.calls += 1
+        return {
+            "place": location,
+            "forecast": [
+                {"day": "Monday", "weather": "sunny", "temperature": {"min": 3, "max": 11}},
+                {"day": "Tuesday", "weather": "rainy", "temperature": {"min": 1, "max": 7}},
+                {"day": "Wednesday", "weather": "cloudy", "temperature": {"min": 2, "max": 9}},
+            ],
+        }
+
+
+def test_prefetched_answers_need_no_network(clock):
+    client = CountingWeather()
+    dm = SimpleDialogueManager(weather_client=client)
+    dm.weather_index = WeatherPrefetcher(client, ["Marburg"], dm.render_weather, max_age=60, clock=clock)
+    dm.weather_index.refresh_all()
+    assert client.calls == 1
+
+    answer = dm.handle(Intent(name="weather_query", slots={"day": 2}), "weather on wednesday")
+    assert answer.startswith("The weather in Marburg on Wednesday is cloudy")
+    dm.handle(Intent(name="weather_query", slots={"location": "marburg"}), "weather in marburg")
+    assert client.calls == 1
+
+    stats = dm.weather_index.stats()["marburg"]
+    assert stats["days"] == 3 and stats["fresh"]
+
+    # stale data falls back to a live request
+    clock.now += 120
+    dm.handle(Intent(name="weather_query", slots={}), "weather")
+    assert client.calls == 2
+
+
+def test_answers_expire_at_midnight(clock):
+    client = CountingWeather()
+    clock.now = datetime(2024, 5, 6, 23, 50).timestamp()
+    dm = SimpleDialogueManager(weather_client=client)
+    dm.weather_index = WeatherPrefetcher(client, ["Marburg"], dm.render_weather, max_age=3600, clock=clock)
+    dm.weather_index.refresh_all()
+    assert dm.weather_index.lookup("Marburg", 0) is not None
+
+    # still fresh by age, but yesterday's "today" must not be served after midnight
+    clock.now += 20 * 60
+    assert dm.weather_index.lookup("Marburg", 0) is None
+    dm.handle(Intent(name="weather_query", slots={}), "weather")
+    assert client.calls == 2
@@ -1,5 +1,7 @@
-from .app import run
+from .startup import PROFILE
+
+with PROFILE.phase("import voice_assistant.app"):
+    from .app import run
 
 if __name__ == "__main__":
     run()
-
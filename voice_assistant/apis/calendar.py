@@ -5,6 +5,7 @@ from typing import Any, Dict, Optional
 import requests
 
 from ..interfaces import CalendarClient
+from .common import APIError, track_request
 
 
 class RestCalendarClient(CalendarClient):
@@ -30,11 +31,12 @@ class RestCalendarClient(CalendarClient):
             "location": location,
         }
 
-        response = requests.post(self.base_url, json=payload)
-        if response.status_code == 200:
-            return response.json().get("entry", response.json())
-        else:
-            raise Exception(f"API error {response.status_code}: {response.text}")
+        with track_request("calendar", "create"):
+            response = requests.post(self.base_url, json=payload)
+            if response.status_code == 200:
+                return response.json().get("entry", response.json())
+            else:
+                raise APIError(response.status_code, f"API error {response.status_code}: {response.text}")
 
     def update_event(
         self,
@@ -61,34 +63,38 @@ class RestCalendarClient(CalendarClient):
         if location is not None:
             payload["location"] = location
 
-        response = requests.put(f"{self.base_url}?id={event_id}", json=payload)
-        if response.status_code == 200:
-            return response.json().get("entry", response.json())
-        else:
-            raise Exception(f"API error {response.status_code}: {response.text}")
+        with track_request("calendar", "update"):
+            response = requests.put(f"{self.base_url}?id={event_id}", json=payload)
+            if response.status_code == 200:
+                return response.json().get("entry", response.json())
+            else:
+                raise APIError(response.status_code, f"API error {response.status_code}: {response.text}")
 
     def get_event(self, event_id: int) -> Dict[str, Any]:
-        response = requests.get(self.base_url + f"?id={event_id}")
-        if response.status_code == 200:
-            return response.json()["entry"]
-        else:
-            raise Exception(f"API error {response.status_code}: {response.text}")
+        with track_request("calendar", "get"):
+            response = requests.get(self.base_url + f"?id={event_id}")
+            if response.status_code == 200:
+                return response.json()["entry"]
+            else:
+                raise APIError(response.status_code, f"API error {response.status_code}: {response.text}")
 
     def delete_event(self, event_id: int) -> Dict[str, Any]:
-        response = requests.delete(self.base_url + f"?id={event_id}")
-        if response.status_code == 200:
-            response = response.json()
-            if response["message"] == "deleted":
-                return response.json()["entry"]
+        with track_request("calendar", "delete"):
+            response = requests.delete(self.base_url + f"?id={event_id}")
+            if response.status_code == 200:
+                body = response.json()
+                if body["message"] == "deleted":
+                    return body.get("entry", body)
+                else:
+                    raise APIError(response.status_code, f"Could not delete the event from calender."
+                                                         f" message: {body['message']}")
             else:
-                raise Exception(f"Could not delete the event from calender."
-                                f" message: {response["message"]}")
-        else:
-            raise Exception(f"API error {response.status_code}: {response.text}")
+                raise APIError(response.status_code, f"API error {response.status_code}: {response.text}")
 
     def list_events(self) -> Dict[str, Any]:
-        response = requests.get(self.base_url)
-        if response.status_code == 200:
-            return response.json()["entries"]
-        else:
-            raise Exception(f"API error {response.status_code}: {response.text}")
+        with track_request("calendar", "list"):
+            response = requests.get(self.base_url)
+            if response.status_code == 200:
+                return response.json()["entries"]
+            else:
+                raise APIError(response.status_code, f"API error {response.status_code}: {response.text}")
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from ..metrics import REGISTRY
+
+
+# error reported by a remote API (as opposed to a network failure)
+class APIError(Exception):
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+REQUEST_TIME = REGISTRY.histogram("api_request_seconds", "Latency of external API calls", labels=("api", "op"))
+REQUEST_ERRORS = REGISTRY.counter("api_errors_total", "Failed external API calls", labels=("api", "op"))
+
+
+# shared instrumentation for the REST clients
+@contextmanager
+def track_request(api: str, op: str) -> Iterator[None]:
+    try:
+        with REQUEST_TIME.time(api=api, op=op):
+            yield
+    except Exception:
+        REQUEST_ERRORS.inc(api=api, op=op)
+        raise
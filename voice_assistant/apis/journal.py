@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ..interfaces import CalendarClient
+from ..metrics import REGISTRY
+from .common import APIError
+
+PENDING = REGISTRY.gauge("calendar_journal_pending", "Calendar writes waiting to be replayed to the API")
+FSYNC_TIME = REGISTRY.histogram("calendar_journal_fsync_seconds", "Duration of one batched journal fsync")
+SUBMIT_TIME = REGISTRY.histogram(
+    "calendar_journal_submit_seconds", "Time until a calendar write is durable in the local journal"
+)
+REPLAYED = REGISTRY.counter("calendar_journal_replayed_total", "Journal records applied to the API", labels=("op",))
+COALESCED = REGISTRY.counter("calendar_journal_coalesced_total", "Journal records merged into an earlier record")
+RETRIES = REGISTRY.counter("calendar_journal_retries_total", "Failed replay attempts that will be retried")
+FAILED = REGISTRY.counter("calendar_journal_failed_total", "Journal records rejected by the API")
+
+
+class CalendarJournal:
+    """
+    Durable write-behind queue for calendar operations.
+
+    Writes are appended to a local JSON-lines journal and acknowledged once
+    fsynced (concurrent writers share one fsync). A background worker replays
+    them to the remote API in order. Pending updates to the same event are
+    coalesced, and a delete drops pending updates of its event. Records are
+    marked with "done" lines, so nothing is replayed twice after a
+    restart. A create whose outcome is unknown (network or server error, crash
+    mid-call) is only resent if the event is not already in the remote calendar.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        client: CalendarClient,
+        batch_window: float = 0.002,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 60.0,
+    ) -> None:
+        self.path = path
+        self.client = client
+        self.batch_window = batch_window
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self.cond = threading.Condition()
+        self.pending: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        # event id -> seq of the pending update that later updates merge into
+        self.pending_updates: Dict[Any, int] = {}
+        self.next_seq = 1
+        self.written_seq = 0
+        self.synced_seq = 0
+        self.stopped = False
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.load()
+        self.file = open(path, "a", encoding="utf-8")
+        self.synced_seq = self.written_seq = self.next_seq - 1
+        PENDING.set(len(self.pending))
+
+        self.threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for target, name in ((self.sync_loop, "journal-sync"), (self.replay_loop, "journal-replay")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join(timeout)
+        with self.cond:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+    # ---- Journal file ----
+
+    # rebuild the pending queue from the journal and compact the file
+    def load(self) -> None:
+        records: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # torn write at the end of the file, the writer was never acknowledged
+                        continue
+                    if "op" in entry:
+                        records[entry["seq"]] = entry
+                        self.next_seq = max(self.next_seq, entry["seq"] + 1)
+                    else:
+                        for seq in entry.get("done", ()):
+                            records.pop(seq, None)
+
+        # enqueue() merges records in place, so it works on copies and the
+        # journal is rewritten with the records exactly as they were read
+        for record in records.values():
+            # a crash may have happened while the call was in flight
+            self.enqueue(dict(record, payload=dict(record["payload"]), uncertain=True))
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for seq in records:
+                fh.write(json.dumps(records[seq]) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+
+    # append a record, returns once it is durable on disk
+    def submit(self, op: str, payload: Dict[str, Any], event_id: Any = None) -> int:
+        start = time.perf_counter()
+        with self.cond:
+            if self.stopped:
+                raise RuntimeError("calendar journal is stopped")
+            seq = self.next_seq
+            self.next_seq += 1
+            record = {"seq": seq, "op": op, "event_id": event_id, "payload": payload}
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            self.written_seq = seq
+            self.enqueue({**record, "payload": dict(payload)})
+            self.cond.notify_all()
+            while self.synced_seq < seq and not self.stopped:
+                self.cond.wait()
+        SUBMIT_TIME.observe(time.perf_counter() - start)
+        return seq
+
+    # group commit: one fsync covers every record written since the last one
+    def sync_loop(self) -> None:
+        while True:
+            with self.cond:
+                while self.synced_seq >= self.written_seq and not self.stopped:
+                    self.cond.wait()
+                if self.stopped:
+                    return
+            if self.batch_window:
+                time.sleep(self.batch_window)
+            with self.cond:
+                target = self.written_seq
+                fileno = self.file.fileno()
+            with FSYNC_TIME.time():
+                os.fsync(fileno)
+            with self.cond:
+                self.synced_seq = max(self.synced_seq, target)
+                self.cond.notify_all()
+
+    # mark records as done; losing this line only means an idempotent replay
+    def mark_done(self, seqs: List[int], error: Optional[str] = None) -> None:
+        entry: Dict[str, Any] = {"done": seqs}
+        if error:
+            entry["error"] = error
+        with self.cond:
+            if self.file.closed:
+                return
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+
+    # ---- Queue ----
+
+    # caller must hold the lock (or be the constructor)
+    def enqueue(self, record: Dict[str, Any]) -> None:
+        record.setdefault("seqs", [record["seq"]])
+        op, event_id = record["op"], record.get("event_id")
+
+        if op == "update" and event_id in self.pending_updates:
+            target = self.pending[self.pending_updates[event_id]]
+            target["payload"].update(record["payload"])
+            target["seqs"].extend(record["seqs"])
+            COALESCED.inc()
+            return
+
+        if op == "delete" and event_id in self.pending_updates:
+            # the pending update would be thrown away by the delete anyway
+            dropped = self.pending.pop(self.pending_updates.pop(event_id))
+            record["seqs"] = dropped["seqs"] + record["seqs"]
+            COALESCED.inc()
+
+        self.pending[record["seq"]] = record
+        if op == "update":
+            self.pending_updates[event_id] = record["seq"]
+        PENDING.set(len(self.pending))
+
+    # take the oldest durable record off the queue
+    def next_record(self) -> Optional[Dict[str, Any]]:
+        with self.cond:
+            while not self.stopped:
+                if self.pending:
+                    seq = next(iter(self.pending))
+                    if seq <= self.synced_seq:
+                        record = self.pending.pop(seq)
+                        if self.pending_updates.get(record.get("event_id")) == seq:
+                            del self.pending_updates[record["event_id"]]
+                        return record
+                self.cond.wait()
+            return None
+
+    # put a record back at the head of the queue after a failed attempt
+    def requeue(self, record: Dict[str, Any]) -> None:
+        with self.cond:
+            self.pending[record["seq"]] = record
+            self.pending.move_to_end(record["seq"], last=False)
+            if record["op"] == "update" and record.get("event_id") not in self.pending_updates:
+                self.pending_updates[record["event_id"]] = record["seq"]
+            PENDING.set(len(self.pending))
+
+    # ---- Replay ----
+
+    def replay_loop(self) -> None:
+        delay = self.retry_delay
+        while True:
+            record = self.next_record()
+            if record is None:
+                return
+            try:
+                self.apply(record)
+            except APIError as exc:
+                if exc.status_code >= 500:
+                    # the server may have stored the event before failing
+                    if record["op"] == "create":
+                        record["uncertain"] = True
+                    self.retry(record, delay)
+                    delay = min(delay * 2, self.max_retry_delay)
+                    continue
+                if not (record.get("uncertain") and record["op"] == "delete"):
+                    # rejected by the API, retrying cannot help
+                    FAILED.inc()
+                    print(f"[CalendarJournal] Dropping {record['op']} #{record['seq']}: {exc}")
+                    self.mark_done(record["seqs"], error=str(exc))
+                    delay = self.retry_delay
+                    continue
+                # an earlier attempt of this delete already went through
+            except Exception:
+                record["uncertain"] = True
+                self.retry(record, delay)
+                delay = min(delay * 2, self.max_retry_delay)
+                continue
+
+            REPLAYED.inc(op=record["op"])
+            self.mark_done(record["seqs"])
+            with self.cond:
+                PENDING.set(len(self.pending))
+            delay = self.retry_delay
+
+    def retry(self, record: Dict[str, Any], delay: float) -> None:
+        RETRIES.inc()
+        self.requeue(record)
+        with self.cond:
+            self.cond.wait_for(lambda: self.stopped, timeout=delay)
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        op, payload, event_id = record["op"], record["payload"], record.get("event_id")
+        if op == "create":
+            if record.get("uncertain") and self.already_created(payload):
+                return
+            self.client.create_event(**payload)
+        elif op == "update":
+            self.client.update_event(event_id=event_id, **payload)
+        elif op == "delete":
+            self.client.delete_event(event_id)
+        else:
+            raise APIError(0, f"unknown journal operation {op!r}")
+
+    def already_created(self, payload: Dict[str, Any]) -> bool:
+        return any(
+            all(entry.get(key) == value for key, value in payload.items())
+            for entry in self.client.list_events()
+        )
+
+
+# calendar client that writes through the journal and reads from the remote API
+class JournaledCalendarClient(CalendarClient):
+
+    def __init__(self, journal: CalendarJournal) -> None:
+        self.journal = journal
+
+    def create_event(
+        self, title: str, description: str, start_time: str, end_time: str, location: str
+    ) -> Dict[str, Any]:
+        payload = {
+            "title": title,
+            "description": description,
+            "start_time": start_time,
+            "end_time": end_time,
+            "location": location,
+        }
+        seq = self.journal.submit("create", payload)
+        return {"queued": seq, **payload}
+
+    def update_event(self, event_id: int, **fields: Optional[str]) -> Dict[str, Any]:
+        payload = {key: value for key, value in fields.items() if value is not None}
+        seq = self.journal.submit("update", payload, event_id=event_id)
+        return {"queued": seq, "id": event_id, **payload}
+
+    def delete_event(self, event_id: int) -> Dict[str, Any]:
+        seq = self.journal.submit("delete", {}, event_id=event_id)
+        return {"queued": seq, "id": event_id}
+
+    def get_event(self, event_id: int) -> Dict[str, Any]:
+        return self.journal.client.get_event(event_id)
+
+    def list_events(self) -> Dict[str, Any]:
+        return self.journal.client.list_events()
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any, Dict
 
 from ..interfaces import WeatherClient
+from .common import APIError, track_request
 
 import requests
 
@@ -13,9 +14,10 @@ class RestWeatherClient(WeatherClient):
 
     def current(self, location: str) -> Dict[str, Any]:
         data = {"place": location}
-        response = requests.post(self.base_url, data=data)
+        with track_request("weather", "current"):
+            response = requests.post(self.base_url, data=data)
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise Exception(f"API error {response.status_code}: {response.text}")
+            if response.status_code == 200:
+                return response.json()
+            else:
+                raise APIError(response.status_code, f"API error {response.status_code}: {response.text}")
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from ..interfaces import WeatherClient
+from ..metrics import REGISTRY
+
+REFRESH_TIME = REGISTRY.histogram(
+    "weather_prefetch_refresh_seconds", "Fetch and precompute time per location", labels=("location",)
+)
+REFRESH_FAILURES = REGISTRY.counter(
+    "weather_prefetch_failures_total", "Failed forecast refreshes", labels=("location",)
+)
+AGE = REGISTRY.gauge("weather_prefetch_age_seconds", "Age of the cached forecast", labels=("location",))
+LOOKUPS = REGISTRY.counter("weather_prefetch_lookups_total", "Answer index lookups", labels=("result",))
+
+
+class WeatherPrefetcher:
+    """
+    Refreshes the forecasts of a fixed set of locations in the background and
+    precomputes the answer for every (location, day index) pair, so common
+    weather questions are answered from memory. Day indexes (and answers
+    saying "today"/"tomorrow") are relative to the fetch date, so answers
+    are not used any more once the local date has changed.
+    `render(location, day_index, day_weather)` builds one answer.
+    """
+
+    def __init__(
+        self,
+        client: WeatherClient,
+        locations: Iterable[str],
+        render: Callable[[str, int, Dict[str, Any]], Any],
+        interval: float = 900.0,
+        max_age: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.client = client
+        self.locations = tuple(locations)
+        self.render = render
+        self.interval = interval
+        self.max_age = max_age
+        self.clock = clock
+
+        self.lock = threading.Lock()
+        # (location key, day index) -> answer
+        self.index: Dict[Tuple[str, int], Any] = {}
+        # location key -> refresh statistics
+        self.refreshed: Dict[str, Dict[str, Any]] = {}
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+        for location in self.locations:
+            AGE.set_function(lambda key=location.lower(): self.age(key), location=location)
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self.loop, name="weather-prefetch", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def loop(self) -> None:
+        while not self.stopped.is_set():
+            self.refresh_all()
+            self.stopped.wait(self.interval)
+
+    def refresh_all(self) -> None:
+        for location in self.locations:
+            if self.stopped.is_set():
+                return
+            try:
+                self.refresh(location)
+            except Exception as exc:
+                REFRESH_FAILURES.inc(location=location)
+                with self.lock:
+                    stats = self.refreshed.setdefault(location.lower(), {"location": location})
+                    stats["failures"] = stats.get("failures", 0) + 1
+                    stats["last_error"] = str(exc)
+                print(f"[WeatherPrefetcher] Refresh for {location} failed: {exc}")
+
+    # fetch one location and swap in its precomputed answers
+    def refresh(self, location: str) -> None:
+        start = time.perf_counter()
+        forecast = self.client.current(location).get("forecast", [])
+        answers = {
+            (location.lower(), day_index): self.render(location, day_index, day_weather)
+            for day_index, day_weather in enumerate(forecast)
+        }
+        duration = time.perf_counter() - start
+        REFRESH_TIME.observe(duration, location=location)
+
+        key = location.lower()
+        with self.lock:
+            for old in [k for k in self.index if k[0] == key]:
+                del self.index[old]
+            self.index.update(answers)
+            stats = self.refreshed.setdefault(key, {"location": location})
+            now = self.clock()
+            stats.update(
+                refreshed_at=now,
+                fetched_on=date.fromtimestamp(now).isoformat(),
+                refresh_seconds=duration,
+                days=len(forecast),
+                refreshes=stats.get("refreshes", 0) + 1,
+            )
+
+    def age(self, key: str) -> float:
+        refreshed_at = self.refreshed.get(key, {}).get("refreshed_at")
+        return float("inf") if refreshed_at is None else self.clock() - refreshed_at
+
+    # precomputed answer, or None when the location is unknown, the data is stale
+    # or it was fetched on an earlier day
+    def lookup(self, location: str, day_index: int) -> Optional[Any]:
+        key = location.lower()
+        with self.lock:
+            answer = self.index.get((key, day_index))
+            fetched_on = self.refreshed.get(key, {}).get("fetched_on")
+        today = date.fromtimestamp(self.clock()).isoformat()
+        if answer is None or self.age(key) > self.max_age or fetched_on != today:
+            LOOKUPS.inc(result="miss")
+            return None
+        LOOKUPS.inc(result="hit")
+        return answer
+
+    # freshness and refresh cost per location
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            out = {key: dict(stats) for key, stats in self.refreshed.items()}
+        for key, stats in out.items():
+            stats["age_seconds"] = self.age(key)
+            stats["fresh"] = stats["age_seconds"] <= self.max_age
+        return out
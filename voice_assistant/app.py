@@ -1,15 +1,45 @@
 from __future__ import annotations
 
+import argparse
 import sys
 import threading
 import time
+from typing import Optional, Sequence
 
-from .config import BLOCKSIZE, MODEL_PATH, SAMPLE_RATE
-from .interfaces import IntentRecognizer, SpeechSynthesizer
+from .config import (
+    ASR_MAX_ALTERNATIVES,
+    BLOCKSIZE,
+    CALENDAR_JOURNAL_PATH,
+    CHANNEL_DELAYS,
+    METRICS_HOST,
+    METRICS_SNAPSHOT_INTERVAL,
+    MODEL_PATH,
+    NATIVE_CAPTURE,
+    SAMPLE_RATE,
+    SESSION_IDLE_TIMEOUT,
+    SESSION_MAX,
+    TTS_DEADLINE,
+    TTS_DEADLINE_PER_CHAR,
+    TTS_INIT_TIMEOUT,
+    TTS_PLAYBACK_PER_CHAR,
+    TTS_STANDBY,
+    WAKE_PHRASES,
+    WAKE_WINDOW,
+    WEATHER_PREFETCH_INTERVAL,
+    WEATHER_PREFETCH_LOCATIONS,
+    WEATHER_PREFETCH_MAX_AGE,
+)
+from .interfaces import Hypothesis, SpeechSynthesizer
+from .apis.journal import CalendarJournal, JournaledCalendarClient
+from .apis.weather_prefetch import WeatherPrefetcher
 from .asr import ASR
-from .tts import EspeakSynthesizer, PyttsxSynthesizer
 from .nlu.rule_based import SimpleRuleNLU
+from .dialogue.context import DEFAULT_SESSION, SessionStore
 from .dialogue.manager import SimpleDialogueManager
+from .dialogue.templates import Utterance
+from .metrics import MetricsServer, SnapshotWriter
+from .profiler import SamplingProfiler
+from .startup import PROFILE
 
 TTS_OPTIONS = {
     "e": ("espeak", "eSpeak NG"),
@@ -39,73 +69,234 @@ def determine_tts_backend(default_choice: str = DEFAULT_TTS_CHOICE) -> tuple[str
         print(f"Unsupported option '{choice}'. Please choose one of: {supported}.")
 
 
+def make_espeak() -> SpeechSynthesizer:
+    with PROFILE.phase("init tts (espeak)"):
+        from .tts import EspeakSynthesizer
+        return EspeakSynthesizer()
+
+
+def make_pyttsx() -> SpeechSynthesizer:
+    with PROFILE.phase("init tts (pyttsx)"):
+        from .tts import PyttsxSynthesizer
+        return PyttsxSynthesizer(language="en")
+
+
+TTS_FACTORIES = {"espeak": make_espeak, "pyttsx": make_pyttsx}
+
+
+# the selected backend speaks; the other one is initialized in the background as a warm standby
 def build_tts() -> SpeechSynthesizer:
     backend, label = determine_tts_backend()
     print(f"[VoiceAssistant] Requested TTS backend: {backend} ({label}).")
-    try:
-        if backend == "espeak":
-            synth = EspeakSynthesizer()
-            print("[VoiceAssistant] eSpeak NG TTS initialized successfully.")
-            return synth
-        synth = PyttsxSynthesizer(language="en")
-        print("[VoiceAssistant] pyttsx3 initialized successfully.")
-        return synth
-    except Exception as exc:
-        print(f"[VoiceAssistant] Failed to initialize '{backend}' backend: {exc}. Falling back to pyttsx3.")
-        return PyttsxSynthesizer(language="en")
+    names = [backend]
+    if TTS_STANDBY:
+        names += [name for name in TTS_FACTORIES if name != backend]
+
+    from .tts import SynthesizerPool
+
+    pool = SynthesizerPool(
+        [(name, TTS_FACTORIES[name]) for name in names],
+        deadline=TTS_DEADLINE,
+        deadline_per_char=TTS_DEADLINE_PER_CHAR,
+        playback_per_char=TTS_PLAYBACK_PER_CHAR,
+    )
+    with PROFILE.phase("wait for tts"):
+        ready = pool.wait_ready(TTS_INIT_TIMEOUT)
+    if ready != backend:
+        requested = pool.backends[0].ready
+        if requested.done():
+            print(f"[VoiceAssistant] Failed to initialize '{backend}' backend. Falling back to {ready}.")
+        else:
+            print(f"[VoiceAssistant] '{backend}' is still initializing. Speaking with {ready} meanwhile.")
+    else:
+        print(f"[VoiceAssistant] {label} TTS initialized successfully.")
+    return pool
+
+
+# backends that support it play a pre-synthesized prefix and only render the tail
+def speak_utterance(tts: SpeechSynthesizer, utterance: Utterance) -> None:
+    speak_parts = getattr(tts, "speak_parts", None)
+    if speak_parts is not None and utterance.prefix:
+        speak_parts(utterance.prefix, utterance.tail)
+    else:
+        tts.speak(utterance.text)
+
+
+# synthesize static response prefixes in the background
+def warm_tts(tts: SpeechSynthesizer, prefixes: list) -> None:
+    warm = getattr(tts, "warm", None)
+    if warm is None:
+        return
+
+    def run_warm() -> None:
+        try:
+            with PROFILE.phase("warm tts prefixes"):
+                warm(prefixes)
+        except Exception as exc:
+            print(f"[VoiceAssistant] Could not pre-synthesize responses: {exc}")
+
+    threading.Thread(target=run_warm, name="tts-warm", daemon=True).start()
+
+
+def build_calendar_journal() -> CalendarJournal:
+    from .apis.calendar import RestCalendarClient
+
+    journal = CalendarJournal(CALENDAR_JOURNAL_PATH, RestCalendarClient())
+    if journal.pending:
+        print(f"[VoiceAssistant] Replaying {len(journal.pending)} queued calendar change(s).")
+    journal.start()
+    return journal
+
+
+def build_weather_prefetcher(dm: SimpleDialogueManager) -> WeatherPrefetcher:
+    prefetcher = WeatherPrefetcher(
+        dm.weather_client,
+        WEATHER_PREFETCH_LOCATIONS,
+        dm.render_weather,
+        interval=WEATHER_PREFETCH_INTERVAL,
+        max_age=WEATHER_PREFETCH_MAX_AGE,
+    )
+    prefetcher.start()
+    return prefetcher
 
 
-def build_asr() -> ASR:
+def build_asr(wake_word: bool = True) -> ASR:
     print("[VoiceAssistant] Using ASR backend: vosk_asr (simple demo recognizer).")
-    return ASR(MODEL_PATH, SAMPLE_RATE, BLOCKSIZE)
+    kwargs = dict(
+        max_alternatives=ASR_MAX_ALTERNATIVES,
+        native_capture=NATIVE_CAPTURE,
+        channel_delays=CHANNEL_DELAYS,
+    )
+    if wake_word:
+        print(f"[VoiceAssistant] Wake phrases: {', '.join(WAKE_PHRASES)}.")
+        kwargs.update(wake_phrases=WAKE_PHRASES, wake_window=WAKE_WINDOW)
+    return ASR(MODEL_PATH, SAMPLE_RATE, BLOCKSIZE, **kwargs)
 
 
-def run() -> None:
-    tts = build_tts()
-    nlu: IntentRecognizer = SimpleRuleNLU()
-    dm = SimpleDialogueManager()
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="voice_assistant", description="Offline voice assistant.")
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print per-phase startup timings (imports, model load, TTS init) once ready",
+    )
+    parser.add_argument(
+        "--no-wake-word",
+        action="store_true",
+        help="decode everything the microphone picks up instead of waiting for a wake phrase",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help=f"serve Prometheus metrics on http://{METRICS_HOST}:PORT/metrics",
+    )
+    parser.add_argument(
+        "--metrics-snapshot",
+        metavar="PATH",
+        help="periodically write a JSON metrics snapshot to PATH",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=METRICS_SNAPSHOT_INTERVAL,
+        help="seconds between JSON snapshots (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="start the sampling profiler on the ASR worker immediately (toggle at runtime via /profile/start|stop)",
+    )
+    return parser.parse_args(argv)
 
-    asr = build_asr()
 
-    def on_text(txt: str) -> None:
-        intent = nlu.parse(txt)
-        response = dm.handle(intent, txt)
-        if response:
-            tts.speak(response)
-        if intent and intent.name == "exit":
-            # small delay to allow TTS to finish
-            time.sleep(0.3)
-            asr.stop()
-            sys.exit(0)
+# start the optional metrics endpoint, snapshot writer and profiler
+def start_monitoring(args: argparse.Namespace) -> list:
+    services: list = []
+    profiler = SamplingProfiler(thread_names=("asr-worker",))
+    if args.profile:
+        profiler.start()
 
-    asr.set_callback(on_text)
+    if args.metrics_port is not None:
+        server = MetricsServer(METRICS_HOST, args.metrics_port, profiler=profiler)
+        server.start()
+        services.append(server)
+        print(f"[VoiceAssistant] Metrics available at http://{METRICS_HOST}:{server.port}/metrics")
 
-    start_event = threading.Event()
-    start_error: list[Exception] = []
+    if args.metrics_snapshot:
+        writer = SnapshotWriter(args.metrics_snapshot, args.metrics_interval)
+        writer.start()
+        services.append(writer)
 
+    return services
+
+
+def run(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    monitoring = start_monitoring(args)
+
+    asr = build_asr(wake_word=not args.no_wake_word)
+
+    load_event = threading.Event()
+    load_error: list[Exception] = []
+
+    # the speech model is the slowest part of startup, start loading it before anything else
     def bootstrap_asr() -> None:
         try:
-            asr.start()
+            asr.load()
         except Exception as exc:
-            start_error.append(exc)
+            load_error.append(exc)
         finally:
-            start_event.set()
+            load_event.set()
+
+    threading.Thread(target=bootstrap_asr, name="asr-load", daemon=True).start()
 
-    threading.Thread(target=bootstrap_asr, daemon=True).start()
+    nlu = SimpleRuleNLU()
+    journal = build_calendar_journal()
+    dm = SimpleDialogueManager(calendar_client=JournaledCalendarClient(journal))
+    dm.weather_index = build_weather_prefetcher(dm)
+    sessions = SessionStore(max_sessions=SESSION_MAX, idle_timeout=SESSION_IDLE_TIMEOUT)
 
+    def on_hypotheses(hypotheses: list[Hypothesis]) -> None:
+        context = sessions.get(DEFAULT_SESSION)
+        intent = nlu.parse_nbest(hypotheses, context)
+        txt = hypotheses[0].text
+        response = dm.handle_utterance(intent, txt, context)
+        if response:
+            speak_utterance(tts, response)
+        if intent and intent.name == "exit":
+            # small delay to allow TTS to finish
+            time.sleep(0.3)
+            asr.stop()
+            sys.exit(0)
+
+    asr.set_hypotheses_callback(on_hypotheses)
+
+    tts = build_tts()
+    warm_tts(tts, dm.warm_prefixes())
     tts.speak("Assistant is starting. Loading speech model. Please wait.")
 
-    if not start_event.wait(timeout=30):
+    if not load_event.wait(timeout=30):
         print("[VoiceAssistant] ASR startup timed out after 30 seconds.")
         tts.speak("The speech model did not load in time. Please try restarting the assistant.")
         return
 
-    if start_error:
-        print("Failed to start ASR:", start_error[0])
+    try:
+        if load_error:
+            raise load_error[0]
+        asr.start()
+    except Exception as exc:
+        print("Failed to start ASR:", exc)
         tts.speak("Failed to load the speech model.")
         return
 
-    tts.speak("Done! Ready to go.")
+    PROFILE.mark_ready()
+    if args.startup_report:
+        PROFILE.report()
+
+    if asr.wake_phrases:
+        tts.speak(f"Done! Say {asr.wake_phrases[0]} to start.")
+    else:
+        tts.speak("Done! Ready to go.")
 
     try:
         while True:
@@ -117,6 +308,11 @@ def run() -> None:
             asr.stop()
         except Exception:
             pass
+        journal.stop()
+        dm.weather_index.stop()
+        tts.stop()
+        for service in monitoring:
+            service.stop()
 
 
 if __name__ == "__main__":
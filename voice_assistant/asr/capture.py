@@ -0,0 +1,146 @@
+from math import gcd
+
+import numpy as np
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler (in_rate -> out_rate) with a windowed-sinc
+    polyphase FIR. Blocks of any size can be fed; filter state is carried
+    across calls so block boundaries are seamless.
+    """
+
+    def __init__(self, in_rate, out_rate, taps_per_phase=24, rolloff=0.9):
+
+        g = gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // g
+        self.down = int(in_rate) // g
+        self.taps = taps_per_phase
+
+        # prototype low-pass at the upsampled rate, cut below the lower Nyquist
+        n = self.taps * self.up
+        cutoff = 0.5 * rolloff / max(self.up, self.down)
+        m = np.arange(n) - (n - 1) / 2.0
+        h = 2 * cutoff * np.sinc(2 * cutoff * m) * np.kaiser(n, 8.0)
+        h *= self.up / h.sum()
+
+        # phases[p, j] = h[p + j * up]; output sample t (at the upsampled rate) uses phase t % up
+        self.phases = h.reshape(self.taps, self.up).T.astype(np.float32)
+        self.offsets = np.arange(self.taps)
+
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.total_in = 0
+        self.next_t = 0
+
+    @property
+    def ratio(self):
+        return self.up / self.down
+
+    # resample one block of mono float samples
+    def process(self, x):
+
+        if self.up == self.down:
+            return x.astype(np.float32, copy=False)
+
+        buf = np.concatenate([self.history, x.astype(np.float32, copy=False)])
+        base = self.total_in - len(self.history)
+        self.total_in += len(x)
+        last = self.total_in - 1
+
+        # every output whose newest input sample is already available
+        count = (last * self.up + self.up - 1 - self.next_t) // self.down + 1
+        if count <= 0:
+            self.history = buf[-(self.taps - 1):]
+            return np.zeros(0, dtype=np.float32)
+
+        ts = self.next_t + self.down * np.arange(count)
+        centers = ts // self.up - base
+        window = buf[centers[:, None] - self.offsets[None, :]]
+        y = np.einsum("ij,ij->i", self.phases[ts % self.up], window)
+
+        self.next_t = int(ts[-1]) + self.down
+        self.history = buf[-(self.taps - 1):]
+        return y
+
+
+class Downmixer:
+    """
+    Reduces a multi-channel block to mono. Without delays this is a (weighted)
+    average; with per-channel sample delays it is a delay-and-sum beamformer
+    steered by those delays.
+    """
+
+    def __init__(self, channels, delays=None, weights=None):
+
+        self.channels = channels
+        self.delays = np.asarray(delays if delays is not None else [0] * channels, dtype=int)
+        if len(self.delays) != channels:
+            raise ValueError("need one delay per channel")
+        w = np.asarray(weights if weights is not None else [1.0] * channels, dtype=np.float32)
+        self.weights = w / w.sum()
+        self.max_delay = int(self.delays.max()) if channels else 0
+        self.history = np.zeros((self.max_delay, channels), dtype=np.float32)
+
+    def process(self, block):
+
+        x = block.astype(np.float32, copy=False)
+        if x.ndim == 1 or self.channels == 1:
+            return x.reshape(len(x), -1)[:, 0]
+        if not self.max_delay:
+            return x @ self.weights
+
+        buf = np.concatenate([self.history, x])
+        n = len(x)
+        # channel c is delayed by delays[c] samples before summing
+        starts = self.max_delay - self.delays
+        rows = starts[None, :] + np.arange(n)[:, None]
+        aligned = buf[rows, np.arange(self.channels)[None, :]]
+        self.history = buf[-self.max_delay:]
+        return aligned @ self.weights
+
+
+class CaptureFrontEnd:
+    """
+    Opens the input device at its native rate and channel count and turns
+    its int16 blocks into 16-bit mono PCM at the model rate.
+    """
+
+    def __init__(self, model_rate=16000, device=None, samplerate=None, channels=None, delays=None):
+
+        self.model_rate = model_rate
+        self.device = device
+        self.samplerate = samplerate
+        self.channels = channels
+        self.delays = delays
+        self.downmix = None
+        self.resampler = None
+
+    # fill in native rate / channel count from the device and build the DSP chain
+    def configure(self, sd=None):
+
+        if self.samplerate is None or self.channels is None:
+            info = sd.query_devices(self.device, "input")
+            if self.samplerate is None:
+                self.samplerate = int(info["default_samplerate"])
+            if self.channels is None:
+                self.channels = max(1, int(info["max_input_channels"]))
+
+        self.downmix = Downmixer(self.channels, self.delays)
+        self.resampler = PolyphaseResampler(self.samplerate, self.model_rate)
+        return self
+
+    # device already delivers what the model expects
+    @property
+    def passthrough(self):
+        return self.samplerate == self.model_rate and self.channels == 1
+
+    # device block size that yields roughly `model_blocksize` samples at the model rate
+    def device_blocksize(self, model_blocksize):
+        return int(round(model_blocksize * self.samplerate / self.model_rate))
+
+    # int16 block (frames, channels) at the native rate -> mono int16 PCM bytes at the model rate
+    def process(self, block):
+
+        mono = self.downmix.process(block)
+        out = self.resampler.process(mono)
+        return np.clip(np.rint(out), -32768, 32767).astype("<i2").tobytes()
@@ -0,0 +1,35 @@
+import math
+
+from ..interfaces import Hypothesis
+
+
+# convert a Vosk result into ranked hypotheses
+# with SetMaxAlternatives(n > 0) the result holds "alternatives" whose "confidence"
+# is a lattice score; these are turned into posteriors with a softmax.
+# otherwise the single transcript gets the mean of its word confidences (SetWords(True))
+def parse_result(result, score_scale=1.0):
+
+    alternatives = result.get("alternatives")
+    if alternatives:
+        texts = [
+            (alt.get("text", "").strip(), float(alt.get("confidence", 0.0)), alt.get("result", []))
+            for alt in alternatives
+        ]
+        top = max(score for _, score, _ in texts)
+        weights = [math.exp((score - top) * score_scale) for _, score, _ in texts]
+        total = sum(weights)
+        hypotheses = [
+            Hypothesis(text, weight / total, words)
+            for (text, _, words), weight in zip(texts, weights)
+            if text
+        ]
+        hypotheses.sort(key=lambda h: h.confidence, reverse=True)
+        return hypotheses
+
+    text = result.get("text", "").strip()
+    if not text:
+        return []
+    words = result.get("result", [])
+    confs = [w["conf"] for w in words if "conf" in w]
+    confidence = sum(confs) / len(confs) if confs else 1.0
+    return [Hypothesis(text, confidence, words)]
@@ -1,71 +1,194 @@
 import json
 import queue
 import threading
+import time
 
-import sounddevice as sd
-from vosk import KaldiRecognizer, Model
+from ..metrics import REGISTRY
+from ..startup import PROFILE
+from .hypotheses import parse_result
+from .wakeword import WakeWordGate
+
+QUEUE_DEPTH = REGISTRY.gauge("asr_queue_depth", "Audio blocks waiting for the decoder")
+DECODE_LAG = REGISTRY.histogram("asr_decode_lag_seconds", "Time an audio block waits in the queue before decoding")
+DECODE_TIME = REGISTRY.histogram(
+    "asr_decode_seconds", "Time spent decoding one audio block", labels=("stage",)
+)
+AUDIO_STATUS = REGISTRY.counter("asr_audio_status_total", "Input stream status flags (overflows etc.)")
+UTTERANCES = REGISTRY.counter("asr_utterances_total", "Recognized non-empty utterances")
+WAKE_TRIGGERS = REGISTRY.counter("asr_wake_triggers_total", "Times the wake phrase opened the listening window")
 
 
 class ASR:
     """
     Small and simple version of Vosk speech recognition.
     Reads audio from microphone and prints recognized text.
+    With `wake_phrases` set, full decoding only runs for `wake_window`
+    seconds after one of the phrases was heard; the window is timed with
+    `wake_clock` (wall time by default, audio time for offline input).
+    With `max_alternatives` > 0 the N best transcripts are passed on.
+    With `native_capture` the microphone is opened at its native rate and
+    channel count and converted to the model rate in the worker thread.
     """
 
     # initialize the recognizer class
-    def __init__(self, model_path, sample_rate=16000, blocksize=8000, device=None):
+    def __init__(
+        self,
+        model_path,
+        sample_rate=16000,
+        blocksize=8000,
+        device=None,
+        wake_phrases=None,
+        wake_window=8.0,
+        wake_clock=time.monotonic,
+        max_alternatives=0,
+        native_capture=False,
+        channel_delays=None,
+    ):
 
         self.model_path = model_path
         self.sample_rate = sample_rate
         self.blocksize = blocksize
         self.device = device
 
+        self.wake_phrases = tuple(wake_phrases or ())
+        self.wake_window = wake_window
+        self.wake_clock = wake_clock
+        self.max_alternatives = max_alternatives
+        self.native_capture = native_capture
+        self.channel_delays = channel_delays
+        self.capture = None
+
         self.model = None
         self.rec = None
+        self.wake = None
+        self.awake = False
 
         self.q = queue.Queue()
         self.stream = None
         self.thread = None
         self.running = False
         self.on_text = None
+        self.on_hypotheses = None
+        self.on_wake = None
 
     # allow setting a custom callback function
     def set_callback(self, fn):
         self.on_text = fn
 
+    # receive all ranked hypotheses (list of Hypothesis) instead of the best text only
+    def set_hypotheses_callback(self, fn):
+        self.on_hypotheses = fn
+
+    # optional callback fired when the wake phrase opens the listening window
+    def set_wake_callback(self, fn):
+        self.on_wake = fn
+
     # constantly called by sounddevice with new audio data
     def audio_callback(self, indata, frames, time_info, status):
 
         if status:
             print(status)
-        self.q.put(bytes(indata))
+            AUDIO_STATUS.inc()
+        self.q.put((time.monotonic(), bytes(indata)))
+        QUEUE_DEPTH.set(self.q.qsize())
+
+    # like audio_callback, but keeps the native multi-channel block for the capture front-end
+    def native_audio_callback(self, indata, frames, time_info, status):
+
+        if status:
+            print(status)
+            AUDIO_STATUS.inc()
+        self.q.put((time.monotonic(), indata.copy()))
+        QUEUE_DEPTH.set(self.q.qsize())
+
+    # load the Vosk model
+    # vosk is imported here so the package can be imported without it
+    # safe to call from a background thread while other components initialize
+    def load(self):
+
+        if self.model is not None:
+            return
+        with PROFILE.phase("import vosk"):
+            from vosk import Model
+        with PROFILE.phase("load vosk model"):
+            self.model = Model(self.model_path)
+
+    # create the recognizers on the loaded model
+    def prepare(self):
+
+        self.load()
+        from vosk import KaldiRecognizer
+
+        self.rec = KaldiRecognizer(self.model, self.sample_rate)
+        # word level confidences, and N-best alternatives when requested
+        self.rec.SetWords(True)
+        if self.max_alternatives:
+            self.rec.SetMaxAlternatives(self.max_alternatives)
+        if self.wake_phrases:
+            self.wake = WakeWordGate.from_model(
+                self.model, self.sample_rate, self.wake_phrases, self.wake_window, self.wake_clock
+            )
 
     # start recognition
     def start(self):
 
         if self.running:
             return
+
+        self.prepare()
+        with PROFILE.phase("import sounddevice"):
+            import sounddevice as sd
+
         self.running = True
 
-        self.model = Model(self.model_path)
-        self.rec = KaldiRecognizer(self.model, self.sample_rate)
+        # create and start the microphone stream
+        self.stream = self.open_stream(sd)
+        self.stream.start()
+
+        # create and start the background worker thread
+        self.thread = threading.Thread(target=self.worker, name="asr-worker", daemon=True)
+        self.thread.start()
+
+    # open the input device, natively when possible
+    def open_stream(self, sd):
 
+        self.capture = None
+        if self.native_capture:
+            try:
+                from .capture import CaptureFrontEnd
+
+                self.capture = CaptureFrontEnd(self.sample_rate, self.device, delays=self.channel_delays)
+                self.capture.configure(sd)
+            except Exception as exc:
+                # numpy missing or the device could not be queried
+                print(f"[ASR] Native capture unavailable ({exc}), requesting {self.sample_rate} Hz mono.")
+                self.capture = None
+
+        if self.capture is not None and not self.capture.passthrough:
+            print(
+                f"[ASR] Capturing {self.capture.channels} channel(s) at {self.capture.samplerate} Hz, "
+                f"converting to {self.sample_rate} Hz mono."
+            )
+            return sd.InputStream(
+                samplerate=self.capture.samplerate,
+                blocksize=self.capture.device_blocksize(self.blocksize),
+                dtype="int16",
+                channels=self.capture.channels,
+                device=self.device,
+                callback=self.native_audio_callback,
+            )
+
+        self.capture = None
         sd.default.samplerate = self.sample_rate
         kwargs = dict(
             samplerate=self.sample_rate,
             blocksize=self.blocksize,
             dtype="int16",
             channels=1,
+            device=self.device,
             callback=self.audio_callback,
         )
-
-        # create and start the microphone stream
-        self.stream = sd.RawInputStream(**kwargs)
-        self.stream.start()
-
-        # create and start the background worker thread
-        self.thread = threading.Thread(target=self.worker, daemon=True)
-        self.thread.start()
+        return sd.RawInputStream(**kwargs)
 
     # stop recognition
     def stop(self):
@@ -83,14 +206,77 @@ class ASR:
     def worker(self):
 
         while self.running:
-            data = self.q.get()
-            if self.rec and self.rec.AcceptWaveform(data):
-                try:
-                    result = json.loads(self.rec.Result())
-                except Exception:
-                    result = {}
-                text = result.get("text", "").strip()
-                if text:
-                    print(">>", text)
-                    if self.on_text:
-                        self.on_text(text)
+            queued_at, data = self.q.get()
+            DECODE_LAG.observe(time.monotonic() - queued_at)
+            QUEUE_DEPTH.set(self.q.qsize())
+            if self.capture is not None:
+                with DECODE_TIME.time(stage="frontend"):
+                    data = self.capture.process(data)
+            self.process(data)
+
+    # decode one audio block
+    def process(self, data):
+
+        if not self.rec:
+            return
+
+        if self.wake is not None and not self.listening():
+            with DECODE_TIME.time(stage="wake"):
+                triggered = self.wake.detect(data)
+            if not triggered:
+                return
+            WAKE_TRIGGERS.inc()
+            print("[ASR] Wake phrase detected, listening.")
+            self.rec.Reset()
+            self.wake.open()
+            self.awake = True
+            if self.on_wake:
+                self.on_wake()
+            # the triggering block is decoded as well so a command spoken
+            # right after the wake phrase is not lost
+
+        with DECODE_TIME.time(stage="full"):
+            final = self.rec.AcceptWaveform(data)
+        if not final:
+            return
+
+        try:
+            result = json.loads(self.rec.Result())
+        except Exception:
+            result = {}
+        hypotheses = parse_result(result)
+        if self.wake is not None:
+            for hyp in hypotheses:
+                hyp.text = self.wake.strip(hyp.text)
+        hypotheses = [h for h in hypotheses if h.text]
+        if not hypotheses:
+            return
+
+        text = hypotheses[0].text
+        UTTERANCES.inc()
+        print(">>", text)
+        if self.wake is not None:
+            # keep listening while the conversation goes on
+            self.wake.open()
+        if self.on_hypotheses:
+            self.on_hypotheses(hypotheses)
+        elif self.on_text:
+            self.on_text(text)
+
+    # whether full decoding should run for the current block
+    # the window is kept open while the user is still mid-sentence
+    def listening(self):
+
+        if self.wake.is_open():
+            return True
+        if not self.awake:
+            return False
+        try:
+            partial = json.loads(self.rec.PartialResult()).get("partial", "")
+        except Exception:
+            partial = ""
+        if partial:
+            return True
+        self.rec.Reset()
+        self.awake = False
+        return False
@@ -0,0 +1,71 @@
+import json
+import re
+import time
+
+
+class WakeWordGate:
+    """
+    Cheap always-on trigger stage in front of full recognition.
+    Runs a Vosk recognizer restricted to a tiny grammar (the wake phrases)
+    and opens a time window in which full decoding is allowed.
+    """
+
+    def __init__(self, recognizer, phrases, window=8.0, clock=time.monotonic):
+
+        self.rec = recognizer
+        self.phrases = tuple(p.lower() for p in phrases)
+        self.window = window
+        self.clock = clock
+        self.open_until = 0.0
+
+        # matches a wake phrase at the start of a full transcript, e.g. "hey assistant what time is it"
+        alternatives = "|".join(re.escape(p) for p in sorted(self.phrases, key=len, reverse=True))
+        self.prefix_re = re.compile(rf"^\s*(?:{alternatives})\b\s*")
+
+    # build the spotter from an already loaded model
+    # "[unk]" lets the grammar absorb everything that is not a wake phrase
+    @classmethod
+    def from_model(cls, model, sample_rate, phrases, window=8.0, clock=time.monotonic):
+
+        from vosk import KaldiRecognizer
+
+        grammar = json.dumps(list(phrases) + ["[unk]"])
+        return cls(KaldiRecognizer(model, sample_rate, grammar), phrases, window, clock)
+
+    def is_open(self):
+        return self.clock() < self.open_until
+
+    # (re)start the listening window
+    def open(self):
+        self.open_until = self.clock() + self.window
+
+    def close(self):
+        self.open_until = 0.0
+
+    # feed one audio block, returns True when a wake phrase was heard
+    # partial results are checked too so the trigger fires mid-utterance
+    def detect(self, data):
+
+        if self.rec.AcceptWaveform(data):
+            text = self.read(self.rec.Result(), "text")
+        else:
+            text = self.read(self.rec.PartialResult(), "partial")
+
+        if self.matches(text):
+            self.rec.Reset()
+            return True
+        return False
+
+    def matches(self, text):
+        return any(p in text for p in self.phrases)
+
+    # remove a leading wake phrase from a full transcript
+    def strip(self, text):
+        return self.prefix_re.sub("", text, count=1).strip()
+
+    @staticmethod
+    def read(raw, key):
+        try:
+            return json.loads(raw).get(key, "").lower()
+        except Exception:
+            return ""
@@ -4,3 +4,43 @@ SAMPLE_RATE = 16000
 BLOCKSIZE = 8000
 MODEL_PATH = os.path.join("models", "voskmodel")
 
+# open the microphone at its native rate/channel count and convert to SAMPLE_RATE mono
+# in software (needs numpy); CHANNEL_DELAYS (samples per channel) enables delay-and-sum beamforming
+NATIVE_CAPTURE = True
+CHANNEL_DELAYS = None
+
+# wake word gating: full recognition only runs for WAKE_WINDOW seconds after a wake phrase
+# phrases must consist of words known to the Vosk model
+WAKE_PHRASES = ("hey assistant", "okay assistant")
+WAKE_WINDOW = 8.0
+
+# TTS failover: the other backend is kept initialized as a standby; an utterance whose audio
+# has not started within TTS_DEADLINE + TTS_DEADLINE_PER_CHAR * len(text) seconds moves to the
+# next backend, and once playing it may take TTS_PLAYBACK_PER_CHAR seconds per character;
+# startup waits at most TTS_INIT_TIMEOUT seconds for the first backend to initialize
+TTS_STANDBY = True
+TTS_INIT_TIMEOUT = 15.0
+TTS_DEADLINE = 2.0
+TTS_DEADLINE_PER_CHAR = 0.02
+TTS_PLAYBACK_PER_CHAR = 0.12
+
+# N-best recognition: number of ASR alternatives passed to the NLU, and the
+# intent confidence below which the assistant asks again instead of acting
+ASR_MAX_ALTERNATIVES = 5
+NLU_MIN_CONFIDENCE = 0.5
+
+# calendar writes are journaled locally and replayed to the API in the background
+CALENDAR_JOURNAL_PATH = os.path.join("data", "calendar_journal.jsonl")
+
+# weather forecasts of these locations are prefetched and answered from memory
+WEATHER_PREFETCH_LOCATIONS = ("Marburg",)
+WEATHER_PREFETCH_INTERVAL = 900.0
+WEATHER_PREFETCH_MAX_AGE = 3600.0
+
+# conversation context (follow-up questions)
+SESSION_MAX = 10000
+SESSION_IDLE_TIMEOUT = 300.0
+
+# runtime metrics (disabled unless a port or snapshot path is given on the command line)
+METRICS_HOST = "127.0.0.1"
+METRICS_SNAPSHOT_INTERVAL = 60.0
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..interfaces import Intent
+
+DEFAULT_SESSION = "default"
+
+
+# per-session conversation state
+# kept deliberately small: one intent name, a short tuple of slot pairs and a timestamp
+class SessionContext:
+
+    __slots__ = ("session_id", "intent", "slots", "last_seen")
+
+    # hard cap on carried slots so a session can never grow unbounded
+    MAX_SLOTS = 8
+
+    def __init__(self, session_id: str, now: float = 0.0) -> None:
+        self.session_id = session_id
+        self.intent: Optional[str] = None
+        self.slots: Tuple[Tuple[str, Any], ...] = ()
+        self.last_seen = now
+
+    # remember the last handled intent and its slots for follow-up turns
+    def remember(self, intent: Intent) -> None:
+        self.intent = intent.name
+        self.slots = tuple(intent.slots.items())[: self.MAX_SLOTS]
+
+    # slots that can be carried into the next turn of the same intent
+    def carried_slots(self) -> Dict[str, Any]:
+        return dict(self.slots)
+
+    def clear(self) -> None:
+        self.intent = None
+        self.slots = ()
+
+
+# LRU store of session contexts keyed by session id
+# sessions are evicted when idle for too long or when the store is full
+class SessionStore:
+
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        idle_timeout: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.sessions: "OrderedDict[str, SessionContext]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    # return the context for a session, creating it if needed
+    def get(self, session_id: str = DEFAULT_SESSION) -> SessionContext:
+        now = self.clock()
+        with self.lock:
+            self.evict_idle(now)
+            ctx = self.sessions.get(session_id)
+            if ctx is None:
+                ctx = SessionContext(session_id, now)
+                self.sessions[session_id] = ctx
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+            else:
+                self.sessions.move_to_end(session_id)
+                ctx.last_seen = now
+            return ctx
+
+    def drop(self, session_id: str) -> None:
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    # entries are ordered by last use, so only the stale head has to be inspected
+    # caller must hold the lock
+    def evict_idle(self, now: float) -> int:
+        evicted = 0
+        cutoff = now - self.idle_timeout
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if oldest.last_seen > cutoff:
+                break
+            self.sessions.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self.sessions
@@ -1,61 +1,211 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
-
-from ..apis.weather import RestWeatherClient
-from ..interfaces import DialogueManager as DialogueManagerIF, Intent
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from ..config import NLU_MIN_CONFIDENCE
+from ..interfaces import CalendarClient, DialogueManager as DialogueManagerIF, Intent, WeatherClient
+from ..metrics import REGISTRY
+from .context import SessionContext
+from .templates import TemplateCatalog, Utterance
+
+if TYPE_CHECKING:
+    from ..apis.weather_prefetch import WeatherPrefetcher
+
+HANDLE_TIME = REGISTRY.histogram("dialogue_handle_seconds", "Time to produce a response", labels=("intent",))
+REPROMPTS = REGISTRY.counter("dialogue_reprompts_total", "Turns answered with a reprompt due to low confidence")
+
+DEFAULT_LOCATION = "Marburg"
+
+# response templates, compiled once per intent
+# the static prefix of each template can be rendered and synthesized ahead of time
+RESPONSES = TemplateCatalog()
+RESPONSES.add(
+    "weather_query",
+    "The weather in {location} {day_phrase} is {condition}, "
+    "with temperatures between {min_temp} and {max_temp} degrees Celsius.",
+    static_fields=("location", "day_phrase"),
+)
+RESPONSES.add("weather_out_of_range", "Sorry, I only have weather data for {days} days ahead.")
+RESPONSES.add("calendar_query", "Calendar API is not available yet.")
+RESPONSES.add("calendar_created", "Okay, I added {title} {day_phrase} at {time}.")
+RESPONSES.add("calendar_failed", "Sorry, I could not save that to your calendar.")
+RESPONSES.add("calendar_unsupported", "I can only add new calendar entries for now.")
+RESPONSES.add("get_time", "It is {time}")
+RESPONSES.add("greet", "Hello! How can I help?")
+RESPONSES.add("exit", "Goodbye!")
+RESPONSES.add("fallback", "Sorry, I didn't get that.")
+RESPONSES.add("reprompt", "Sorry, I'm not sure I understood. Could you say that again?")
+
+STATIC_RESPONSES = ("greet", "exit", "fallback", "reprompt")
 
 
 class SimpleDialogueManager(DialogueManagerIF):
 
-    def __init__(self):
-        self.weather_client = RestWeatherClient()
-
-    def handle(self, intent: Optional[Intent], raw_text: str) -> str:
+    def __init__(
+        self,
+        weather_client: Optional[WeatherClient] = None,
+        min_confidence: float = NLU_MIN_CONFIDENCE,
+        calendar_client: Optional[CalendarClient] = None,
+        weather_index: Optional["WeatherPrefetcher"] = None,
+    ):
+        self._weather_client = weather_client
+        self.calendar_client = calendar_client
+        self.weather_index = weather_index
+        self.min_confidence = min_confidence
+        # (minute since epoch, rendered "HH:MM") so the clock is formatted once per minute
+        self._time_cache: Tuple[int, str] = (-1, "")
+
+    # the REST client (and `requests`) is only imported on the first weather question
+    @property
+    def weather_client(self) -> WeatherClient:
+        if self._weather_client is None:
+            from ..apis.weather import RestWeatherClient
+            self._weather_client = RestWeatherClient()
+        return self._weather_client
+
+    @weather_client.setter
+    def weather_client(self, client: WeatherClient) -> None:
+        self._weather_client = client
+
+    def handle(self, intent: Optional[Intent], raw_text: str, context: Optional[SessionContext] = None) -> str:
+        return self.handle_utterance(intent, raw_text, context).text
+
+    # like handle(), but keeps the static prefix and the variable tail apart for TTS caching
+    def handle_utterance(
+        self, intent: Optional[Intent], raw_text: str, context: Optional[SessionContext] = None
+    ) -> Utterance:
         if intent is None:
-            return ""
+            return Utterance("")
+
+        # a cheap reprompt instead of acting (or calling an API) on a likely misrecognition
+        if intent.name != "fallback" and intent.confidence < self.min_confidence:
+            REPROMPTS.inc()
+            return RESPONSES.render("reprompt")
+
+        with HANDLE_TIME.time(intent=intent.name):
+            response = self.respond(intent, raw_text)
 
+        # keep the turn so follow-ups like "and tomorrow?" can reuse its slots
+        if context is not None and intent.name != "fallback":
+            context.remember(intent)
+
+        return response
+
+    def respond(self, intent: Intent, raw_text: str) -> Utterance:
         if intent.name == "weather_query":
             return self.create_weather_response(intent, raw_text)
 
         if intent.name == "calendar_query":
-            return "Calendar API is not available yet."
+            return self.create_calendar_response(intent, raw_text)
 
         if intent.name == "get_time":
-            return "It is " + datetime.now().strftime("%H:%M")
-        if intent.name == "greet":
-            return "Hello! How can I help?"
-        if intent.name == "exit":
-            return "Goodbye!"
+            return RESPONSES.render("get_time", time=self.current_time())
+
+        if intent.name in STATIC_RESPONSES:
+            return RESPONSES.render(intent.name)
 
         # fallback
-        return "Sorry, I didn't get that."
+        return RESPONSES.render("fallback")
+
+    def current_time(self) -> str:
+        minute = int(time.time() // 60)
+        cached_minute, text = self._time_cache
+        if minute != cached_minute:
+            text = datetime.now().strftime("%H:%M")
+            self._time_cache = (minute, text)
+        return text
+
+    # prefixes worth synthesizing at startup
+    def warm_prefixes(self) -> List[str]:
+        prefixes = [RESPONSES.render(key).text for key in STATIC_RESPONSES]
+        prefixes += RESPONSES.prefixes("calendar_created")
+        prefixes += RESPONSES.prefixes("get_time")
+        prefixes += RESPONSES.prefixes(
+            "weather_query",
+            [{"location": DEFAULT_LOCATION, "day_phrase": p} for p in ("today", "tomorrow")],
+        )
+        return prefixes
 
     def create_weather_response(self, intent, raw_text):
-        location = intent.slots.get("location", "Marburg")
+        location = intent.slots.get("location", DEFAULT_LOCATION)
         day_index = intent.slots.get("day", 0)
 
+        # answered from the prefetched index without any network I/O when possible
+        if self.weather_index is not None:
+            answer = self.weather_index.lookup(location, day_index)
+            if answer is not None:
+                return answer
+
         weather = self.weather_client.current(location)
         forecast = weather.get("forecast", [])
 
         if day_index >= len(forecast):
-            return f"Sorry, I only have weather data for {len(forecast)} days ahead."
+            return RESPONSES.render("weather_out_of_range", days=len(forecast))
 
-        day_weather = forecast[day_index]
-        week_day = day_weather["day"]
-        condition = day_weather["weather"]
-        min_temp = day_weather["temperature"]["min"]
-        max_temp = day_weather["temperature"]["max"]
+        return self.render_weather(location, day_index, forecast[day_index])
 
+    def render_weather(self, location: str, day_index: int, day_weather: dict) -> Utterance:
         if day_index == 0:
             day_phrase = "today"
         elif day_index == 1:
             day_phrase = "tomorrow"
         else:
-            day_phrase = f"on {week_day}"
+            day_phrase = f"on {day_weather['day']}"
+
+        return RESPONSES.render(
+            "weather_query",
+            location=location,
+            day_phrase=day_phrase,
+            condition=day_weather["weather"],
+            min_temp=day_weather["temperature"]["min"],
+            max_temp=day_weather["temperature"]["max"],
+        )
 
-        return (
-            f"The weather in {location} {day_phrase} is {condition}, "
-            f"with temperatures between {min_temp} and {max_temp} degrees Celsius."
+    # with a journaled calendar client this is a local disk write, the API call happens in the background
+    def create_calendar_response(self, intent, raw_text):
+        if self.calendar_client is None:
+            return RESPONSES.render("calendar_query")
+        if intent.slots.get("action") != "create":
+            return RESPONSES.render("calendar_unsupported")
+
+        title = intent.slots.get("title", "Meeting")
+        day_index = intent.slots.get("day", 0)
+        now = datetime.now()
+        day = now + timedelta(days=day_index)
+        if "time" in intent.slots:
+            hour, minute = (int(part) for part in intent.slots["time"].split(":"))
+            start = day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        elif day_index == 0:
+            # next full hour
+            start = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        else:
+            start = day.replace(hour=9, minute=0, second=0, microsecond=0)
+        end = start + timedelta(hours=1)
+
+        try:
+            self.calendar_client.create_event(
+                title=title,
+                description=raw_text,
+                start_time=start.strftime("%Y-%m-%dT%H:%M"),
+                end_time=end.strftime("%Y-%m-%dT%H:%M"),
+                location="",
+            )
+        except Exception as exc:
+            print(f"[Dialogue] Calendar write failed: {exc}")
+            return RESPONSES.render("calendar_failed")
+
+        if start.date() == now.date():
+            day_phrase = "today"
+        elif start.date() == (now + timedelta(days=1)).date():
+            day_phrase = "tomorrow"
+        else:
+            day_phrase = f"on {start.strftime('%A')}"
+        article = "an" if title[0] in "AEIOU" else "a"
+        return RESPONSES.render(
+            "calendar_created",
+            title=f"{article} {title.lower()}",
+            day_phrase=day_phrase,
+            time=start.strftime("%H:%M"),
         )
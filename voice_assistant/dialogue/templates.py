@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from string import Formatter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+FORMATTER = Formatter()
+
+
+# a response split into a cacheable static prefix and a variable tail
+@dataclass(frozen=True)
+class Utterance:
+    prefix: str
+    tail: str = ""
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.tail
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __bool__(self) -> bool:
+        return bool(self.prefix or self.tail)
+
+
+# a response template compiled once into literal and field parts
+# format specs and conversions ("{temp:.1f}", "{name!r}") behave as in str.format
+# fields listed in `static_fields` belong to the prefix; the prefix ends at
+# the first field that is not static, e.g. for
+#   "The weather in {location} {day_phrase} is {condition}."
+# with static fields (location, day_phrase) the prefix for Marburg/today is
+#   "The weather in Marburg today is "
+class ResponseTemplate:
+
+    def __init__(self, pattern: str, static_fields: Sequence[str] = (), cache_size: int = 256) -> None:
+        self.pattern = pattern
+        parsed = list(FORMATTER.parse(pattern))
+        for _, field, spec, _ in parsed:
+            if field is not None and (field == "" or field.isdigit()):
+                raise ValueError(f"template fields must be named: {pattern!r}")
+            if "{" in (spec or ""):
+                raise ValueError(f"nested fields are not supported: {pattern!r}")
+        self.parts: Tuple[Tuple[str, Optional[str]], ...] = tuple((literal, field) for literal, field, _, _ in parsed)
+        # (conversion, format spec) of each part's field
+        self.formats: Tuple[Tuple[Optional[str], str], ...] = tuple(
+            (conversion, spec or "") for _, _, spec, conversion in parsed
+        )
+        self.fields = tuple(field for _, field in self.parts if field is not None)
+
+        # number of parts that make up the prefix (the literal of the first
+        # non-static field still belongs to the prefix)
+        static = set(static_fields)
+        self.prefix_parts = len(self.parts)
+        for i, (_, field) in enumerate(self.parts):
+            if field is not None and field not in static:
+                self.prefix_parts = i
+                break
+        self.prefix_fields = tuple(f for _, f in self.parts[: self.prefix_parts] if f is not None)
+
+        self.cache_size = cache_size
+        self.prefix_cache: "OrderedDict[Tuple[str, ...], str]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def render(self, **values: Any) -> Utterance:
+        return Utterance(self.prefix(values), self.tail(values))
+
+    # value of the field of part `i`, converted and formatted like str.format would
+    def field(self, i: int, values: Dict[str, Any]) -> str:
+        conversion, spec = self.formats[i]
+        return FORMATTER.format_field(FORMATTER.convert_field(values[self.parts[i][1]], conversion), spec)
+
+    # rendered prefix, cached per combination of static field values
+    def prefix(self, values: Dict[str, Any]) -> str:
+        rendered = [self.field(i, values) if field is not None else ""
+                    for i, (_, field) in enumerate(self.parts[: self.prefix_parts])]
+        key = tuple(rendered)
+        with self.lock:
+            cached = self.prefix_cache.get(key)
+            if cached is not None:
+                self.prefix_cache.move_to_end(key)
+                return cached
+
+        out = [literal + value for (literal, _), value in zip(self.parts[: self.prefix_parts], rendered)]
+        if self.prefix_parts < len(self.parts):
+            out.append(self.parts[self.prefix_parts][0])
+        text = "".join(out)
+
+        with self.lock:
+            self.prefix_cache[key] = text
+            while len(self.prefix_cache) > self.cache_size:
+                self.prefix_cache.popitem(last=False)
+        return text
+
+    def tail(self, values: Dict[str, Any]) -> str:
+        if self.prefix_parts >= len(self.parts):
+            return ""
+        out = [self.field(self.prefix_parts, values)]
+        for i in range(self.prefix_parts + 1, len(self.parts)):
+            literal, field = self.parts[i]
+            out.append(literal)
+            if field is not None:
+                out.append(self.field(i, values))
+        return "".join(out)
+
+
+# per-intent template registry
+class TemplateCatalog:
+
+    def __init__(self) -> None:
+        self.templates: Dict[str, ResponseTemplate] = {}
+
+    def add(self, key: str, pattern: str, static_fields: Sequence[str] = ()) -> ResponseTemplate:
+        template = self.templates[key] = ResponseTemplate(pattern, static_fields)
+        return template
+
+    def render(self, key: str, **values: Any) -> Utterance:
+        return self.templates[key].render(**values)
+
+    # prefixes for the given static field bindings, e.g. to pre-synthesize them
+    def prefixes(self, key: str, bindings: Iterable[Dict[str, Any]] = ({},)) -> List[str]:
+        template = self.templates[key]
+        return [template.prefix(values) for values in bindings]
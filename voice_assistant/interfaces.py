@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
 
 
 # ---- Core Data Types ----
@@ -11,6 +11,15 @@ from typing import Any, Callable, Dict, Optional
 class Intent:
     name: str
     slots: Dict[str, Any]
+    confidence: float = 1.0
+
+
+# one ASR alternative with its posterior and optional word timings/confidences
+@dataclass
+class Hypothesis:
+    text: str
+    confidence: float = 1.0
+    words: List[Dict[str, Any]] = field(default_factory=list)
 
 
 # ---- Interfaces ----
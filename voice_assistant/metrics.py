@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .profiler import SamplingProfiler
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+# base class for all metric types
+# values are stored per tuple of label values, in the order of `label_names`
+class Metric(ABC):
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.lock = threading.Lock()
+
+    def key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, LabelValues, float]]: ...
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [
+            {"labels": dict(zip(self.label_names, key)), "value": value}
+            for _, key, value in self.samples()
+        ]
+
+
+class Counter(Metric):
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, help, label_names)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels: Any) -> float:
+        return self.values.get(self.key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, LabelValues, float]]:
+        with self.lock:
+            return [(self.name, key, value) for key, value in self.values.items()]
+
+
+class Gauge(Metric):
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, help, label_names)
+        self.values: Dict[LabelValues, float] = {}
+        self.functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    # evaluate `fn` at collection time instead of storing a value
+    def set_function(self, fn: Callable[[], float], **labels: Any) -> None:
+        key = self.key(labels)
+        with self.lock:
+            self.functions[key] = fn
+
+    def get(self, **labels: Any) -> float:
+        key = self.key(labels)
+        fn = self.functions.get(key)
+        return float(fn()) if fn else self.values.get(key, 0.0)
+
+    def samples(self) -> List[Tuple[str, LabelValues, float]]:
+        with self.lock:
+            values = dict(self.values)
+            functions = dict(self.functions)
+        for key, fn in functions.items():
+            try:
+                values[key] = float(fn())
+            except Exception:
+                continue
+        return [(self.name, key, value) for key, value in values.items()]
+
+
+class Histogram(Metric):
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [per-bucket counts..., +Inf count], sum
+        self.counts: Dict[LabelValues, List[int]] = {}
+        self.sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self.key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.counts.get(key)
+            if counts is None:
+                counts = self.counts[key] = [0] * (len(self.buckets) + 1)
+                self.sums[key] = 0.0
+            counts[index] += 1
+            self.sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        return sum(self.counts.get(self.key(labels), ()))
+
+    def samples(self) -> List[Tuple[str, LabelValues, float]]:
+        out = []
+        with self.lock:
+            items = [(key, list(counts), self.sums[key]) for key, counts in self.counts.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                out.append((self.name + "_bucket", key + (format_float(bound),), cumulative))
+            cumulative += counts[-1]
+            out.append((self.name + "_bucket", key + ("+Inf",), cumulative))
+            out.append((self.name + "_sum", key, total))
+            out.append((self.name + "_count", key, cumulative))
+        return out
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            items = [(key, list(counts), self.sums[key]) for key, counts in self.counts.items()]
+        out = []
+        for key, counts, total in items:
+            bounds = [format_float(b) for b in self.buckets] + ["+Inf"]
+            out.append({
+                "labels": dict(zip(self.label_names, key)),
+                "count": sum(counts),
+                "sum": total,
+                "buckets": dict(zip(bounds, counts)),
+            })
+        return out
+
+
+def format_float(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return f"{value:.1f}"
+    return repr(value)
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# process-wide collection of metrics
+# metrics are created on first request and shared by name afterwards
+class Registry:
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+        self.lock = threading.Lock()
+
+    def get_or_create(self, cls: type, name: str, help: str, labels: Sequence[str], **kwargs: Any) -> Metric:
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, labels, **kwargs)
+            elif not isinstance(metric, cls) or metric.label_names != tuple(labels):
+                raise ValueError(f"metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.get_or_create(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.get_or_create(Gauge, name, help, labels)
+
+    def histogram(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.get_or_create(Histogram, name, help, labels, buckets=buckets)
+
+    # Prometheus text exposition format (version 0.0.4)
+    def render_prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            names = metric.label_names
+            if metric.kind == "histogram":
+                names = names + ("le",)
+            for sample_name, key, value in metric.samples():
+                label_names = names if len(key) == len(names) else metric.label_names
+                labels = ",".join(f'{n}="{escape_label(v)}"' for n, v in zip(label_names, key))
+                labels = "{" + labels + "}" if labels else ""
+                lines.append(f"{sample_name}{labels} {format_float(float(value))}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return {
+            "timestamp": time.time(),
+            "metrics": {m.name: {"type": m.kind, "help": m.help, "values": m.snapshot()} for m in metrics},
+        }
+
+
+REGISTRY = Registry()
+
+
+# ---- Process metrics ----
+
+def resident_memory_bytes() -> float:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+    except Exception:
+        return 0.0
+
+
+REGISTRY.gauge("process_resident_memory_bytes", "Resident memory size in bytes").set_function(resident_memory_bytes)
+REGISTRY.gauge("process_threads", "Number of live Python threads").set_function(threading.active_count)
+REGISTRY.gauge("process_cpu_seconds", "CPU time consumed by the process").set_function(time.process_time)
+
+
+# ---- Periodic JSON snapshots ----
+
+class SnapshotWriter:
+    """Writes `REGISTRY.snapshot()` to a JSON file every `interval` seconds."""
+
+    def __init__(self, path: str, interval: float = 60.0, registry: Optional[Registry] = None) -> None:
+        self.path = path
+        self.interval = interval
+        self.registry = registry or REGISTRY
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self.loop, name="metrics-snapshot", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.write()
+
+    def write(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump(self.registry.snapshot(), fh)
+        os.replace(tmp, self.path)
+
+    def loop(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                self.write()
+            except Exception as exc:
+                print(f"[Metrics] Failed to write snapshot to {self.path}: {exc}")
+
+
+# ---- HTTP endpoint ----
+
+class MetricsServer:
+    """
+    Local HTTP endpoint:
+      /metrics         Prometheus text format
+      /metrics.json    JSON snapshot
+      /profile         collapsed stacks captured so far
+      /profile/start   enable the sampling profiler
+      /profile/stop    disable the sampling profiler
+      /profile/reset   drop captured stacks
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9464,
+        registry: Optional[Registry] = None,
+        profiler: Optional["SamplingProfiler"] = None,
+    ) -> None:
+        self.registry = registry or REGISTRY
+        self.profiler = profiler
+        self.httpd = ThreadingHTTPServer((host, port), self.make_handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def route(self, path: str) -> Tuple[int, str, str]:
+        if path == "/metrics":
+            return 200, "text/plain; version=0.0.4; charset=utf-8", self.registry.render_prometheus()
+        if path == "/metrics.json":
+            return 200, "application/json", json.dumps(self.registry.snapshot())
+        if path.startswith("/profile"):
+            if self.profiler is None:
+                return 404, "text/plain", "profiler not configured\n"
+            action = path[len("/profile"):].strip("/")
+            if action == "start":
+                self.profiler.start()
+            elif action == "stop":
+                self.profiler.stop()
+            elif action == "reset":
+                self.profiler.reset()
+            elif action:
+                return 404, "text/plain", "unknown profiler action\n"
+            else:
+                return 200, "text/plain", self.profiler.collapsed()
+            return 200, "text/plain", f"profiler running: {self.profiler.running}\n"
+        return 404, "text/plain", "not found\n"
+
+    def make_handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                status, content_type, body = server.route(self.path.split("?", 1)[0])
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_POST = do_GET
+
+            # keep the console free for the assistant output
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
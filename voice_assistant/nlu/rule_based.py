@@ -1,33 +1,189 @@
 from __future__ import annotations
 
 import re
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 
-from ..interfaces import Intent, IntentRecognizer
+from ..interfaces import Hypothesis, Intent, IntentRecognizer
+from ..metrics import REGISTRY
+
+if TYPE_CHECKING:
+    from ..dialogue.context import SessionContext
+
+DAY_PHRASES = (
+    ("day after tomorrow", 2),
+    ("tomorrow", 1),
+    ("today", 0),
+)
+
+# words that end a location phrase ("in berlin tomorrow please"); determiners,
+# possessives and time words keep "for my trip" or "for next week" from becoming a place
+LOCATION_STOPWORDS = {
+    "today", "tomorrow", "day", "after", "please", "the", "and", "at", "on",
+    "now", "then", "like", "is", "be", "will", "going",
+    "a", "an", "my", "our", "your", "his", "her", "their", "this", "that", "these", "those",
+    "next", "last", "coming", "it", "me", "us", "here", "there",
+    "weekend", "week", "tonight", "morning", "afternoon", "evening", "night",
+}
+
+# lookahead, so a phrase that ends early ("for my trip in paris") does not hide the next one
+LOCATION_RE = re.compile(r"\b(?=(?:in|for|about) ([a-z]+(?: [a-z]+){0,2}))")
+
+# only a leading command verb makes a create, "what's new" or "make it to the meeting" are queries
+CREATE_RE = re.compile(r"^(?:(?:please|can you|could you|would you) )?(?:create|add|book|schedule|set up)\b")
+TITLE_RE = re.compile(r"\b(meeting|appointment|event|reminder)\b")
+
+# ASR transcripts spell numbers out ("at three thirty p m")
+HOUR_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+MINUTE_WORDS = {"fifteen": 15, "thirty": 30, "forty five": 45}
+TIME_RE = re.compile(
+    r"\bat (\d{1,2}|" + "|".join(HOUR_WORDS) + r")"
+    r"(?::(\d{2})| (" + "|".join(MINUTE_WORDS) + r"))?"
+    r"(?: o'?clock)?(?: ?(a ?m|p ?m|a\.m\.|p\.m\.|in the morning|in the afternoon|in the evening))?"
+)
+
+# short follow-ups such as "and tomorrow?" or "what about berlin"
+FOLLOW_UP_RE = re.compile(r"^(and|what about|how about|and in|and for)\b|\b(today|tomorrow)\b")
+
+# intent keyword table, in priority order (the first intent found in an utterance wins)
+INTENT_TABLE = (
+    ("weather_query", r"\b(weather|temperature|forecast|rain|raining|sunny|cloudy|snow)\b"),
+    ("calendar_query", r"\b(calendar|calender|meeting|meet|event|schedule|appointment|reminder)\b"),
+    ("get_time", r"\b(time|current time|what time is it|what('s| is) the time)\b"),
+    ("greet", r"\b(hi|hello|hey|good (morning|afternoon|evening))\b"),
+    ("exit", r"\b(exit|quit|stop|close|goodbye)\b"),
+)
+INTENT_PRIORITY = {name: rank for rank, (name, _) in enumerate(INTENT_TABLE)}
+
+# all intents compiled into one alternation, so a single scan finds every intent keyword
+INTENT_RE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in INTENT_TABLE))
+
+PARSE_TIME = REGISTRY.histogram("nlu_parse_seconds", "Time to classify one utterance")
+INTENTS = REGISTRY.counter("nlu_intents_total", "Recognized intents", labels=("intent",))
 
 
 class SimpleRuleNLU(IntentRecognizer):
-    def parse(self, text: str) -> Optional[Intent]:
+    def parse(self, text: str, context: Optional["SessionContext"] = None) -> Optional[Intent]:
+        with PARSE_TIME.time():
+            intent = self.match(text, context)
+        if intent is not None:
+            INTENTS.inc(intent=intent.name)
+        return intent
+
+    # score all ASR alternatives against the intent table and pick the intent
+    # with the highest total posterior; its share becomes the intent confidence
+    def parse_nbest(
+        self, hypotheses: Sequence[Hypothesis], context: Optional["SessionContext"] = None
+    ) -> Optional[Intent]:
+        with PARSE_TIME.time():
+            scores: Dict[str, float] = {}
+            best: Dict[str, Intent] = {}
+            for hyp in hypotheses:
+                intent = self.match(hyp.text, context)
+                if intent is None:
+                    continue
+                scores[intent.name] = scores.get(intent.name, 0.0) + hyp.confidence
+                # hypotheses are ranked, so the first one per intent carries the slots
+                best.setdefault(intent.name, intent)
+
+            if not scores:
+                return None
+            name = max(scores, key=lambda n: (scores[n], -INTENT_PRIORITY.get(n, len(INTENT_TABLE))))
+            intent = best[name]
+            intent.confidence = min(1.0, scores[name])
+
+        INTENTS.inc(intent=intent.name)
+        return intent
+
+    # names of all intents whose keywords occur in the text, in priority order
+    def classify(self, t: str) -> List[str]:
+        found = {m.lastgroup for m in INTENT_RE.finditer(t)}
+        return sorted(found, key=INTENT_PRIORITY.__getitem__)
+
+    def match(self, text: str, context: Optional["SessionContext"] = None) -> Optional[Intent]:
         t = (text or "").lower().strip()
         if not t:
             return None
 
-        # Weather-related queries
-        if re.search(r"\b(weather|temperature|forecast|rain|raining|sunny|cloudy|snow)\b", t):
-            return self.get_weather_intent(text)
+        found = self.classify(t)
+        if found:
+            name = found[0]
+            if name == "weather_query":
+                return self.get_weather_intent(text, context)
+            if name == "calendar_query":
+                return Intent(name=name, slots=self.extract_calendar_slots(t))
+            return Intent(name=name, slots={})
 
-        # Calendar-related queries
-        if re.search(r"\b(calendar|calender|meeting|meet|event|schedule|appointment|reminder)\b", t):
-            return Intent(name="calendar_query", slots={})
-
-        if re.search(r"\b(time|current time|what time is it|what('s| is) the time)\b", t):
-            return Intent(name="get_time", slots={})
-        if re.search(r"\b(hi|hello|hey|good (morning|afternoon|evening))\b", t):
-            return Intent(name="greet", slots={})
-        if re.search(r"\b(exit|quit|stop|close|goodbye)\b", t):
-            return Intent(name="exit", slots={})
+        # follow-up on the previous weather question of this session
+        if context is not None and context.intent == "weather_query" and FOLLOW_UP_RE.search(t):
+            return self.get_weather_intent(text, context)
 
         return Intent(name="fallback", slots={"text": t})
 
-    def get_weather_intent(self, text: str) -> Optional[Intent]:
-        return Intent(name="weather_query", slots={})
\ No newline at end of file
+    def get_weather_intent(self, text: str, context: Optional["SessionContext"] = None) -> Optional[Intent]:
+        slots: Dict[str, Any] = {}
+        if context is not None and context.intent == "weather_query":
+            slots.update(context.carried_slots())
+        slots.update(self.extract_weather_slots(text))
+        return Intent(name="weather_query", slots=slots)
+
+    # pull day offset and location out of the utterance
+    def extract_weather_slots(self, text: str) -> Dict[str, Any]:
+        t = (text or "").lower()
+        slots: Dict[str, Any] = {}
+
+        day = self.extract_day(t)
+        if day is not None:
+            slots["day"] = day
+
+        for match in LOCATION_RE.finditer(t):
+            words = []
+            for word in match.group(1).split():
+                if word in LOCATION_STOPWORDS:
+                    break
+                words.append(word)
+            if words:
+                slots["location"] = " ".join(w.capitalize() for w in words)
+                break
+
+        return slots
+
+    def extract_day(self, t: str) -> Optional[int]:
+        for phrase, offset in DAY_PHRASES:
+            if re.search(rf"\b{phrase}\b", t):
+                return offset
+        return None
+
+    # action, title, day offset and time of a calendar request
+    def extract_calendar_slots(self, t: str) -> Dict[str, Any]:
+        slots: Dict[str, Any] = {}
+        if CREATE_RE.match(t):
+            slots["action"] = "create"
+
+        title = TITLE_RE.search(t)
+        if title:
+            slots["title"] = title.group(1).capitalize()
+
+        day = self.extract_day(t)
+        if day is not None:
+            slots["day"] = day
+
+        match = TIME_RE.search(t)
+        if match:
+            hour_text, minute_digits, minute_words, period = match.groups()
+            hour = int(hour_text) if hour_text.isdigit() else HOUR_WORDS[hour_text]
+            minute = int(minute_digits) if minute_digits else MINUTE_WORDS.get(minute_words, 0)
+            period = (period or "").replace(" ", "").replace(".", "")
+            if period in ("pm", "intheafternoon", "intheevening") and hour < 12:
+                hour += 12
+            elif period in ("am", "inthemorning") and hour == 12:
+                hour = 0
+            elif not period and 1 <= hour <= 7:
+                # "at three" during the working day means the afternoon
+                hour += 12
+            if hour < 24 and minute < 60:
+                slots["time"] = f"{hour:02d}:{minute:02d}"
+
+        return slots
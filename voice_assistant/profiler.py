@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Iterable, Optional
+
+
+# opt-in sampling profiler for hot-path stacks (e.g. the ASR worker)
+# samples the stacks of the named threads every `interval` seconds while enabled;
+# output uses the collapsed-stack format understood by flamegraph tools
+class SamplingProfiler:
+
+    def __init__(self, thread_names: Iterable[str] = ("asr-worker",), interval: float = 0.005) -> None:
+        self.thread_names = set(thread_names)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        # stop flag of the current run; every run gets its own, so a sampler
+        # thread from an earlier run can never keep going next to a new one
+        self.stopped: Optional[threading.Event] = None
+        self.control = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.stopped is not None and not self.stopped.is_set()
+
+    def start(self) -> None:
+        with self.control:
+            if self.running:
+                return
+            self.stopped = threading.Event()
+            self.thread = threading.Thread(
+                target=self.loop, args=(self.stopped,), name="sampling-profiler", daemon=True
+            )
+            self.thread.start()
+
+    def stop(self) -> None:
+        with self.control:
+            if self.stopped is not None:
+                self.stopped.set()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stacks.clear()
+            self.samples = 0
+
+    def loop(self, stopped: threading.Event) -> None:
+        while not stopped.is_set():
+            self.sample()
+            stopped.wait(self.interval)
+
+    def sample(self) -> None:
+        targets = {t.ident for t in threading.enumerate() if t.name in self.thread_names}
+        if not targets:
+            return
+        frames = sys._current_frames()
+        with self.lock:
+            for ident in targets:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                self.stacks[collapse(frame)] += 1
+            self.samples += 1
+
+    # "outer;...;inner count" lines, hottest first
+    def collapsed(self) -> str:
+        with self.lock:
+            items = self.stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+
+def collapse(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+
+# records how long each startup phase takes (imports, model load, TTS init)
+# the report mirrors the layout of `python -X importtime`
+class StartupProfile:
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.lock = threading.Lock()
+        # (phase name, start offset, duration, thread name)
+        self.phases: List[Tuple[str, float, float, str]] = []
+        self.ready_at: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                self.phases.append((name, start - self.t0, end - start, threading.current_thread().name))
+
+    # mark the moment the assistant is ready to listen
+    def mark_ready(self) -> None:
+        self.ready_at = time.perf_counter() - self.t0
+
+    def report(self, out: Optional[TextIO] = None) -> None:
+        out = out or sys.stderr
+        with self.lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        print("startup: start [ms] | duration [ms] | thread | phase", file=out)
+        for name, start, duration, thread in phases:
+            print(f"startup: {start * 1e3:10.1f} | {duration * 1e3:13.1f} | {thread:<6} | {name}", file=out)
+        if self.ready_at is not None:
+            print(f"startup: ready after {self.ready_at * 1e3:.1f} ms", file=out)
+
+
+PROFILE = StartupProfile()
@@ -1,4 +1,21 @@
-from .pyttsx_tts import PyttsxSynthesizer
-from .espeak_tts import EspeakSynthesizer
+from __future__ import annotations
 
-__all__ = ["PyttsxSynthesizer", "EspeakSynthesizer"]
+import importlib
+
+# backends are imported on first access so that unused engines
+# (and their heavy dependencies) are never loaded
+_BACKENDS = {
+    "PyttsxSynthesizer": ".pyttsx_tts",
+    "EspeakSynthesizer": ".espeak_tts",
+    "SynthesizerPool": ".pool",
+}
+
+__all__ = ["PyttsxSynthesizer", "EspeakSynthesizer", "SynthesizerPool"]
+
+
+def __getattr__(name: str):
+    module_name = _BACKENDS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(module_name, __name__)
+    return getattr(module, name)
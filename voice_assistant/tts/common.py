@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from ..metrics import REGISTRY
+
+SPEAK_TIME = REGISTRY.histogram(
+    "tts_speak_seconds", "Wall time of one speak() call (synthesis and playback)", labels=("backend",)
+)
+SPEAK_ERRORS = REGISTRY.counter("tts_errors_total", "Failed speak() calls", labels=("backend",))
+BACKLOG = REGISTRY.gauge("tts_backlog", "Utterances currently waiting for or in synthesis")
+
+
+# shared instrumentation for all synthesizer backends
+@contextmanager
+def track_speak(backend: str) -> Iterator[None]:
+    BACKLOG.inc()
+    try:
+        with SPEAK_TIME.time(backend=backend):
+            yield
+    except Exception:
+        SPEAK_ERRORS.inc(backend=backend)
+        raise
+    finally:
+        BACKLOG.dec()
@@ -1,8 +1,36 @@
 from __future__ import annotations
 
 import shutil
+import struct
 import subprocess
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import ExitStack
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .common import track_speak
+
+
+def parse_wav(data: bytes) -> Tuple[int, bytes]:
+    """Return (sample rate, PCM frames) of a 16-bit mono WAV as written by ``espeak-ng --stdout``."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise RuntimeError("eSpeak NG did not produce WAV output")
+    rate = 0
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, size = data[pos:pos + 4], struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            channels, rate = struct.unpack("<HI", data[body + 2:body + 8])
+            bits = struct.unpack("<H", data[body + 14:body + 16])[0]
+            if channels != 1 or bits != 16:
+                raise RuntimeError(f"Unsupported eSpeak NG output: {channels} channels, {bits} bits")
+        elif chunk_id == b"data":
+            # the size field is unreliable when streaming to stdout, use the rest of the buffer
+            return rate, data[body:]
+        pos = body + size + (size & 1)
+    raise RuntimeError("eSpeak NG WAV output has no data chunk")
 
 
 class EspeakSynthesizer:
@@ -16,6 +44,7 @@ class EspeakSynthesizer:
         volume: int = 120,
         binary: Optional[str] = None,
         extra_args: Optional[List[str]] = None,
+        prefix_cache_size: int = 64,
     ) -> None:
         self._binary = binary or shutil.which("espeak-ng") or shutil.which("espeak")
         if not self._binary:
@@ -26,11 +55,20 @@ class EspeakSynthesizer:
         self._volume = max(0, min(volume, 200))
         self._extra_args = list(extra_args or [])
 
-    def speak(self, text: str) -> None:
-        if not text:
-            return
+        # pre-synthesized PCM of static response prefixes
+        self._prefix_cache: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+        self._prefix_cache_size = prefix_cache_size
+        self._cache_lock = threading.Lock()
+
+        # running eSpeak NG processes, so a hung one can be killed
+        self._procs: Set[subprocess.Popen] = set()
+        self._procs_lock = threading.Lock()
 
-        cmd = [
+        # set by SynthesizerPool for the current call, see Playback
+        self.begin_audio: Optional[Callable[[], bool]] = None
+
+    def _command(self, text: str, *extra: str) -> List[str]:
+        return [
             self._binary,
             "-v",
             self._voice,
@@ -39,15 +77,101 @@ class EspeakSynthesizer:
             "-a",
             str(self._volume),
             *self._extra_args,
+            *extra,
             text,
         ]
 
+    def _run(self, cmd: List[str], stdout: int) -> bytes:
+        with subprocess.Popen(cmd, stdout=stdout, stderr=subprocess.DEVNULL) as proc:
+            with self._procs_lock:
+                self._procs.add(proc)
+            try:
+                out, _ = proc.communicate()
+            finally:
+                with self._procs_lock:
+                    self._procs.discard(proc)
+        if proc.returncode != 0:
+            raise RuntimeError(f"eSpeak NG synthesis failed with exit code {proc.returncode}")
+        return out or b""
+
+    def _may_play(self) -> bool:
+        return self.begin_audio is None or self.begin_audio()
+
+    def speak(self, text: str) -> None:
+        if not text:
+            return
+
+        with track_speak("espeak"):
+            # the CLI plays while it synthesizes, audio starts with the process
+            if self._may_play():
+                self._run(self._command(text), subprocess.DEVNULL)
+
+    def synthesize(self, text: str) -> Tuple[int, bytes]:
+        """Render text to (sample rate, 16-bit mono PCM) without playing it."""
+        return parse_wav(self._run(self._command(text, "--stdout"), subprocess.PIPE))
+
+    def cancel(self) -> None:
+        """Kill running eSpeak NG processes, e.g. after a missed deadline."""
+        with self._procs_lock:
+            procs = list(self._procs)
+        for proc in procs:
+            proc.kill()
+
+    def _cached_pcm(self, text: str) -> Tuple[int, bytes]:
+        with self._cache_lock:
+            cached = self._prefix_cache.get(text)
+            if cached is not None:
+                self._prefix_cache.move_to_end(text)
+                return cached
+        rendered = self.synthesize(text)
+        with self._cache_lock:
+            self._prefix_cache[text] = rendered
+            while len(self._prefix_cache) > self._prefix_cache_size:
+                self._prefix_cache.popitem(last=False)
+        return rendered
+
+    def warm(self, prefixes: Iterable[str]) -> None:
+        """Pre-synthesize static response prefixes so later turns only render their tail."""
+        for text in prefixes:
+            if text:
+                self._cached_pcm(text)
+
+    def _synthesize_async(self, text: str) -> Future:
+        future: Future = Future()
+
+        def render() -> None:
+            try:
+                future.set_result(self.synthesize(text))
+            except Exception as exc:
+                future.set_exception(exc)
+
+        threading.Thread(target=render, name="espeak-tail", daemon=True).start()
+        return future
+
+    def _parts(self, prefix: str, tail: Optional[Future]) -> Iterator[Tuple[int, bytes]]:
+        if prefix:
+            yield self._cached_pcm(prefix)
+        if tail is not None:
+            yield tail.result()
+
+    def speak_parts(self, prefix: str, tail: str) -> None:
+        """Play the cached prefix while the tail is synthesized, then append the tail."""
         try:
-            subprocess.run(
-                cmd,
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-        except subprocess.CalledProcessError as exc:
-            raise RuntimeError(f"eSpeak NG synthesis failed with exit code {exc.returncode}") from exc
+            import sounddevice as sd
+        except Exception:
+            # no PCM playback available, let the CLI play the whole sentence
+            self.speak(prefix + tail)
+            return
+
+        with track_speak("espeak"), ExitStack() as stack:
+            stream = None
+            for rate, pcm in self._parts(prefix, self._synthesize_async(tail) if tail else None):
+                if not pcm:
+                    continue
+                if stream is None and not self._may_play():
+                    return
+                if stream is None or stream.samplerate != rate:
+                    # let the previous part finish before switching rates
+                    stack.close()
+                    stream = stack.enter_context(sd.RawOutputStream(samplerate=rate, channels=1, dtype="int16"))
+                stream.write(pcm)
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, TimeoutError as FutureTimeout, wait
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from ..interfaces import SpeechSynthesizer
+from ..metrics import REGISTRY
+
+FAILOVERS = REGISTRY.counter(
+    "tts_failovers_total", "Utterances spoken by a standby after another backend failed", labels=("backend",)
+)
+DEADLINES_MISSED = REGISTRY.counter(
+    "tts_deadline_exceeded_total", "Utterances a backend did not start or finish in time", labels=("backend",)
+)
+HEALTHY = REGISTRY.gauge("tts_backend_healthy", "1 if the backend is eligible for new utterances", labels=("backend",))
+LATENCY = REGISTRY.gauge(
+    "tts_backend_first_audio_seconds", "Smoothed time from a speak() call to its first audio", labels=("backend",)
+)
+
+
+class Playback:
+    """
+    First-audio handshake for one call. A backend that supports it has a
+    `begin_audio` attribute; the pool points it at `begin` for the duration
+    of the call, and the backend calls it right before it makes any sound.
+    Once the pool has given up on the call, `begin` returns False and the
+    backend must return without playing anything.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # set when audio starts or the call is over
+        self.progress = threading.Event()
+        self.started_at: Optional[float] = None
+        self.abandoned = False
+
+    def begin(self) -> bool:
+        with self.lock:
+            if self.abandoned:
+                return False
+            if self.started_at is None:
+                self.started_at = time.perf_counter()
+            self.progress.set()
+            return True
+
+    # give up on a call that has not started playing; False if it already has
+    def abandon(self) -> bool:
+        with self.lock:
+            if self.started_at is not None:
+                return False
+            self.abandoned = True
+            return True
+
+    def finished(self, _future: Future) -> None:
+        self.progress.set()
+
+
+class PooledBackend:
+    """
+    One synthesizer living on its own worker thread. The backend is created
+    on that thread and every call runs there, so engines with thread
+    affinity (pyttsx3/SAPI) are always used from the thread that built them.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], SpeechSynthesizer], preference: int) -> None:
+        self.name = name
+        self.preference = preference
+        self.synth: Optional[SpeechSynthesizer] = None
+        self.ready: Future = Future()
+        self.jobs: "queue.Queue[Optional[Tuple[Future, Callable[..., Any], tuple]]]" = queue.Queue()
+        # call that missed its deadline and still occupies the worker
+        self.stuck: Optional[Future] = None
+        self.failures = 0
+        self.retry_at = 0.0
+        self.first_audio: Optional[float] = None
+
+        self.thread = threading.Thread(target=self.worker, args=(factory,), name=f"tts-{name}", daemon=True)
+        self.thread.start()
+
+    def worker(self, factory: Callable[[], SpeechSynthesizer]) -> None:
+        try:
+            self.synth = factory()
+        except Exception as exc:
+            self.ready.set_exception(exc)
+            return
+        self.ready.set_result(self.synth)
+
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        future: Future = Future()
+        self.jobs.put((future, fn, args))
+        return future
+
+    def stop(self) -> None:
+        self.jobs.put(None)
+
+    # initialized and not blocked by a hung call
+    def available(self) -> bool:
+        if not self.ready.done() or self.ready.exception() is not None:
+            return False
+        if self.stuck is not None:
+            if not self.stuck.done():
+                return False
+            self.stuck = None
+        return True
+
+    def healthy(self, now: float) -> bool:
+        return self.available() and now >= self.retry_at
+
+    # backends that report their first audio can be abandoned before they make a sound
+    def gated(self) -> bool:
+        return hasattr(self.synth, "begin_audio")
+
+    def record_success(self, first_audio: float, smoothing: float) -> None:
+        self.failures = 0
+        self.retry_at = 0.0
+        if self.first_audio is None:
+            self.first_audio = first_audio
+        else:
+            self.first_audio += smoothing * (first_audio - self.first_audio)
+
+    def record_failure(self, now: float, cooldown: float, max_cooldown: float) -> None:
+        self.failures += 1
+        self.retry_at = now + min(cooldown * 2 ** (self.failures - 1), max_cooldown)
+
+
+class SynthesizerPool(SpeechSynthesizer):
+    """
+    Keeps several TTS backends initialized and speaks through the one with
+    the lowest time to first audio. The deadline covers synthesis only: a
+    backend that has not started playing within `deadline` plus
+    `deadline_per_char` per character is abandoned, benched (with
+    exponential backoff) and the utterance goes to the next backend at once,
+    since an abandoned backend will not start playing any more (see
+    Playback). Once audio has started, the call gets `playback_per_char`
+    per character (plus `deadline`) to finish, so long utterances are not
+    cut off. A call that overruns while it may be playing is cancelled and
+    the pool waits until it has ended, so two backends never talk at the
+    same time; a call that can neither be cancelled nor finishes within
+    another deadline is considered hung. Backends without the handshake
+    only report completion, so their deadline also includes playback and
+    their latency is the whole call. Backends without measurements keep
+    their configured order behind measured ones, so the first backend stays
+    in use until a standby has proven itself.
+    """
+
+    def __init__(
+        self,
+        factories: Sequence[Tuple[str, Callable[[], SpeechSynthesizer]]],
+        deadline: float = 2.0,
+        deadline_per_char: float = 0.02,
+        playback_per_char: float = 0.12,
+        cooldown: float = 5.0,
+        max_cooldown: float = 300.0,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not factories:
+            raise ValueError("need at least one TTS backend")
+        self.deadline = deadline
+        self.deadline_per_char = deadline_per_char
+        self.playback_per_char = playback_per_char
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.smoothing = smoothing
+        self.clock = clock
+        # one utterance at a time, overlapping speech is never wanted
+        self.lock = threading.Lock()
+
+        self.backends: List[PooledBackend] = []
+        for preference, (name, factory) in enumerate(factories):
+            backend = PooledBackend(name, factory, preference)
+            self.backends.append(backend)
+            HEALTHY.set_function(lambda b=backend: float(b.healthy(self.clock())), backend=name)
+            LATENCY.set_function(
+                lambda b=backend: b.first_audio if b.first_audio is not None else float("nan"),
+                backend=name,
+            )
+
+    # wait until any backend is initialized, not necessarily the preferred one;
+    # the others keep warming up in the background
+    def wait_ready(self, timeout: Optional[float] = None) -> str:
+        end = None if timeout is None else time.monotonic() + timeout
+        pending = {backend.ready: backend for backend in self.backends}
+        errors = []
+        while pending:
+            remaining = None if end is None else max(0.0, end - time.monotonic())
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            # several may finish together, prefer the configured order
+            for backend in [b for b in self.backends if b.ready in done]:
+                del pending[backend.ready]
+                error = backend.ready.exception()
+                if error is None:
+                    return backend.name
+                errors.append(f"{backend.name}: {error}")
+        errors += [f"{backend.name}: not ready within {timeout:.1f} s" for backend in pending.values()]
+        raise RuntimeError("no TTS backend could be initialized (" + "; ".join(errors) + ")")
+
+    def stop(self) -> None:
+        for backend in self.backends:
+            backend.stop()
+
+    # healthy backends, quickest to first audio first; if all are benched, any that is not hung
+    def ranked(self) -> List[PooledBackend]:
+        now = self.clock()
+        candidates = [b for b in self.backends if b.healthy(now)]
+        if not candidates:
+            candidates = [b for b in self.backends if b.available()]
+        return sorted(
+            candidates,
+            key=lambda b: (b.first_audio is None, b.first_audio or 0.0, b.preference),
+        )
+
+    def speak(self, text: str) -> None:
+        if text:
+            self.call("speak", (text,), len(text))
+
+    def speak_parts(self, prefix: str, tail: str) -> None:
+        if prefix or tail:
+            self.call("speak_parts", (prefix, tail), len(prefix) + len(tail))
+
+    def call(self, method: str, args: tuple, chars: int) -> None:
+        first_audio = self.deadline + self.deadline_per_char * chars
+        playing = self.deadline + self.playback_per_char * chars
+        errors = []
+        with self.lock:
+            for backend in self.ranked():
+                fn = getattr(backend.synth, method, None)
+                call_args = args
+                if fn is None:
+                    fn, call_args = backend.synth.speak, ("".join(args),)
+
+                gated = backend.gated()
+                # without the handshake only the end of the call can be observed
+                limit = first_audio if gated else first_audio + playing - self.deadline
+                playback = Playback()
+                start = time.perf_counter()
+                future = backend.submit(self.run_gated, backend.synth, playback, fn, call_args)
+                future.add_done_callback(playback.finished)
+
+                if not playback.progress.wait(limit):
+                    DEADLINES_MISSED.inc(backend=backend.name)
+                    backend.first_audio = max(backend.first_audio or 0.0, limit)
+                    backend.record_failure(self.clock(), self.cooldown, self.max_cooldown)
+                    if gated and playback.abandon():
+                        # silent and it will stay silent, the standby can start right away
+                        self.cancel(backend)
+                        if not future.done():
+                            backend.stuck = future
+                        errors.append(f"{backend.name}: no audio within {limit:.1f} s")
+                        continue
+                    if not gated:
+                        if self.wait_out(backend, future, limit, errors):
+                            return
+                        continue
+                    # started playing just as the deadline passed
+
+                try:
+                    future.result(timeout=playing)
+                except FutureTimeout:
+                    DEADLINES_MISSED.inc(backend=backend.name)
+                    backend.record_failure(self.clock(), self.cooldown, self.max_cooldown)
+                    if self.wait_out(backend, future, playing, errors):
+                        return
+                    continue
+                except Exception as exc:
+                    backend.record_failure(self.clock(), self.cooldown, self.max_cooldown)
+                    errors.append(f"{backend.name}: {exc}")
+                    continue
+
+                end = playback.started_at if playback.started_at is not None else time.perf_counter()
+                backend.record_success(end - start, self.smoothing)
+                if errors:
+                    FAILOVERS.inc(backend=backend.name)
+                    print(f"[SynthesizerPool] Failed over to {backend.name} ({'; '.join(errors)}).")
+                return
+
+        raise RuntimeError("no TTS backend could speak (" + ("; ".join(errors) or "none available") + ")")
+
+    # runs on the backend's worker thread, so begin_audio is only set for this call
+    @staticmethod
+    def run_gated(synth: SpeechSynthesizer, playback: Playback, fn: Callable[..., Any], args: tuple) -> Any:
+        if not hasattr(synth, "begin_audio"):
+            return fn(*args)
+        synth.begin_audio = playback.begin
+        try:
+            return fn(*args)
+        finally:
+            synth.begin_audio = None
+
+    # a late call may still be playing: cancel it and wait until it has ended, so the
+    # standby never talks over it; True if it finished on its own and was spoken
+    def wait_out(self, backend: PooledBackend, future: Future, grace: float, errors: List[str]) -> bool:
+        cancelled = self.cancel(backend)
+        if not wait([future], timeout=grace).done:
+            backend.stuck = future
+            errors.append(f"{backend.name}: hung for {grace:.1f} s after its deadline")
+            return False
+        if cancelled or future.exception() is not None:
+            errors.append(f"{backend.name}: not done in time")
+            return False
+        return True
+
+    # ask a late backend to abort its current call, if it knows how
+    # runs on the caller's thread, the backend's own thread is busy with the call
+    def cancel(self, backend: PooledBackend) -> bool:
+        cancel = getattr(backend.synth, "cancel", None)
+        if cancel is None:
+            return False
+        try:
+            cancel()
+        except Exception as exc:
+            print(f"[SynthesizerPool] Could not cancel {backend.name}: {exc}")
+            return False
+        return True
+
+    # pre-synthesize prefixes on every backend that caches them
+    def warm(self, prefixes: Iterable[str]) -> None:
+        prefixes = list(prefixes)
+        for backend in self.backends:
+            try:
+                synth = backend.ready.result()
+            except Exception:
+                continue
+            warm = getattr(synth, "warm", None)
+            if warm is not None:
+                warm(prefixes)
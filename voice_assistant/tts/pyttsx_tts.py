@@ -3,17 +3,18 @@ from __future__ import annotations
 
 # imports
 import sys
-from typing import Optional
-import pyttsx3
+from typing import Callable, Optional
 
-try:
-    import win32com.client as wincl
-except Exception:
-    wincl = None
+from ..startup import PROFILE
+from .common import track_speak
 
 
 # thin wrapper around pyttsx3 for simple TTS
 # works as a fallback
+# there is no cancel(): the engine and SAPI voice are COM objects bound to the
+# thread that created them, and speak() blocks that thread, so nothing can
+# safely stop an utterance while it is running; the pool can only drop it
+# before it starts (begin_audio)
 class PyttsxSynthesizer:
 
     def __init__(self, *, language: Optional[str] = "en", voice_name: Optional[str] = None, rate: int = 170) -> None:
@@ -21,6 +22,8 @@ class PyttsxSynthesizer:
         self.sapi_voice = None
         self.sapi_output_bound = False
         self.sapi_output_desc: Optional[str] = None
+        # set by SynthesizerPool for the current call, see Playback
+        self.begin_audio: Optional[Callable[[], bool]] = None
 
         # selection of preferences
         self.pref_language = (language or "").lower() or None
@@ -31,7 +34,18 @@ class PyttsxSynthesizer:
         self.init()
 
     # initialize pyttsx3 engine
+    # pyttsx3 and pywin32 are imported here so they are only loaded when this backend is used
     def init(self) -> None:
+        with PROFILE.phase("import pyttsx3"):
+            import pyttsx3
+
+        wincl = None
+        if sys.platform.startswith("win"):
+            try:
+                import win32com.client as wincl
+            except Exception:
+                wincl = None
+
         try:
             if sys.platform.startswith("win"):
                 self.engine = pyttsx3.init(driverName="sapi5")
@@ -40,9 +54,11 @@ class PyttsxSynthesizer:
         except Exception:
             self.engine = pyttsx3.init()
 
-        self.choose_voice()
+        with PROFILE.phase("init pyttsx3 voices"):
+            self.choose_voice()
         self.engine.setProperty("rate", self.pref_rate)
         self.engine.setProperty("volume", 1.0)
+        self.engine.connect("started-utterance", self.on_started_utterance)
 
         # handle windows SAPI specifics
         if wincl and sys.platform.startswith("win"):
@@ -184,16 +200,26 @@ class PyttsxSynthesizer:
     def speak(self, text: str) -> None:
         if not text:
             return
-        try:
-            if self.sapi_voice is not None and self.sapi_output_bound:
-                self.sapi_voice.Speak(text)
-                return
-        except Exception:
-            pass
+        with track_speak("pyttsx"):
+            try:
+                if self.sapi_voice is not None and self.sapi_output_bound:
+                    if self.may_play():
+                        self.sapi_voice.Speak(text)
+                    return
+            except Exception:
+                pass
 
-        try:
+            try:
+                self.engine.stop()
+            except Exception:
+                pass
+            self.engine.say(text)
+            self.engine.runAndWait()
+
+    def may_play(self) -> bool:
+        return self.begin_audio is None or self.begin_audio()
+
+    # runs on the engine's own thread inside runAndWait, where stop() is safe
+    def on_started_utterance(self, name: Optional[str]) -> None:
+        if not self.may_play():
             self.engine.stop()
-        except Exception:
-            pass
-        self.engine.say(text)
-        self.engine.runAndWait()